@@ -6,6 +6,7 @@ SDESA Python库 - 建筑施工示例
 
 import sys
 import os
+import multiprocessing
 import numpy as np
 import matplotlib.pyplot as plt
 
@@ -15,7 +16,7 @@ sys.path.append('/home/ubuntu/sdesa_lib')
 # 导入SDESA库
 from sdesa.core import FlowEntity, ResourceEntity, Event
 from sdesa.model import Activity, Model
-from sdesa.engine import SimulationEngine
+from sdesa.engine import SimulationEngine, VectorizedMonteCarloEngine
 from sdesa.statistics import SimulationStatistics
 from sdesa.utils import RandomGenerator
 from sdesa.visualization import GanttChart, ResourceUtilizationChart, ActivityNetworkGraph, DashboardGenerator
@@ -23,26 +24,20 @@ from sdesa.visualization import GanttChart, ResourceUtilizationChart, ActivityNe
 # 设置随机数种子，确保结果可重现
 RandomGenerator.set_seed(42)
 
-def create_earthmoving_model():
+def create_earthmoving_activities():
     """
-    创建土方工程模型
+    创建土方工程活动
     
     基于SDESA论文中的土方工程案例，包括装载、运输、卸载和返回四个活动。
     
     返回:
-        Model: 土方工程模型
+        list: 活动列表
     """
-    print("创建土方工程模型...")
-    
-    # 创建模型
-    model = Model(name="土方工程模型")
-    
-    # 定义活动
     # 1. 装载活动
     load_activity = Activity(
         id="load",
         name="装载",
-        duration_function=lambda: RandomGenerator.triangular(5, 8, 12),
+        duration_params=(5, 8, 12),
         required_resources=["loader"],
         released_resources=["loader"],
         successor_activities=["haul"]
@@ -52,7 +47,7 @@ def create_earthmoving_model():
     haul_activity = Activity(
         id="haul",
         name="运输",
-        duration_function=lambda: RandomGenerator.triangular(15, 20, 30),
+        duration_params=(15, 20, 30),
         required_resources=[],
         released_resources=[],
         successor_activities=["dump"]
@@ -62,7 +57,7 @@ def create_earthmoving_model():
     dump_activity = Activity(
         id="dump",
         name="卸载",
-        duration_function=lambda: RandomGenerator.triangular(3, 5, 8),
+        duration_params=(3, 5, 8),
         required_resources=["spotter"],
         released_resources=["spotter"],
         successor_activities=["return"]
@@ -72,12 +67,31 @@ def create_earthmoving_model():
     return_activity = Activity(
         id="return",
         name="返回",
-        duration_function=lambda: RandomGenerator.triangular(10, 15, 25),
+        duration_params=(10, 15, 25),
         required_resources=[],
         released_resources=[],
         successor_activities=["load"]
     )
     
+    return [load_activity, haul_activity, dump_activity, return_activity]
+
+def create_earthmoving_model():
+    """
+    创建土方工程模型
+    
+    基于SDESA论文中的土方工程案例，包括装载、运输、卸载和返回四个活动。
+    
+    返回:
+        Model: 土方工程模型
+    """
+    print("创建土方工程模型...")
+    
+    # 创建模型
+    model = Model(name="土方工程模型")
+    
+    # 定义活动
+    load_activity, haul_activity, dump_activity, return_activity = create_earthmoving_activities()
+    
     # 添加活动到模型
     model.add_activity(load_activity)
     model.add_activity(haul_activity)
@@ -262,7 +276,161 @@ def visualize_results(engine, stats, output_dir):
     
     return files
 
-def sensitivity_analysis(model, parameter_ranges, output_dir):
+def _run_sensitivity_case(case):
+    """
+    运行敏感性分析的单个工况
+    
+    该函数在工作进程中执行，由传入的活动、卡车数量和资源描述重新创建模型并运行模拟。
+    
+    参数:
+        case (tuple): (活动列表, 卡车所在的活动ID, 卡车数量, 资源描述列表, 模拟持续时间, 随机数种子)，
+            资源描述为(资源ID, 资源类型, 是否为一次性资源)
+    
+    返回:
+        dict: 该工况的卡车数量、总体资源利用率和总完成次数
+    """
+    activities, entry_activity_id, num_trucks, resource_specs, duration, seed = case
+    RandomGenerator.set_seed(seed)
+    
+    # 创建新模型
+    new_model = Model(name=f"土方工程模型（{num_trucks}辆卡车）")
+    
+    # 添加活动（工作进程中的活动是原模型活动的副本）
+    for activity in activities:
+        new_model.add_activity(activity)
+    
+    # 添加卡车
+    for i in range(num_trucks):
+        truck = FlowEntity(
+            id=f"truck_{i}",
+            activity_id=entry_activity_id,
+            arrival_time=0
+        )
+        new_model.add_flow_entity(truck)
+    
+    # 添加资源
+    for resource_id, resource_type, disposable in resource_specs:
+        new_model.add_resource(ResourceEntity(
+            id=resource_id,
+            type=resource_type,
+            ready_time=0,
+            available=True,
+            disposable=disposable
+        ))
+    
+    # 运行模拟
+    engine = SimulationEngine(new_model)
+    engine.run(duration=duration)
+    
+    # 获取统计数据
+    stats = SimulationStatistics(
+        activity_statistics=engine.statistics['activity_statistics'],
+        resource_statistics=engine.statistics['resource_statistics'],
+        total_simulation_time=engine.statistics['total_simulation_time']
+    )
+    
+    # 计算总体资源利用率
+    overall_utilization = stats.calculate_overall_resource_utilization()
+    
+    # 计算总完成次数
+    total_completions = sum(stats.activity_statistics[activity_id].completion_count 
+                           for activity_id in stats.activity_statistics 
+                           if activity_id == 'dump')
+    
+    return {
+        'num_trucks': num_trucks,
+        'overall_utilization': overall_utilization,
+        'total_completions': total_completions
+    }
+
+def _entry_activity(model):
+    """
+    返回卡车开始所在的活动ID
+    
+    参数:
+        model (Model): 模型对象
+    
+    返回:
+        str or None: 第一个初始流实体所在的活动ID，没有初始流实体时为第一个活动的ID
+    """
+    if model.initial_flow_entities:
+        return model.initial_flow_entities[0].activity_id
+    return next(iter(model.activities), None)
+
+def _model_cycle(model):
+    """
+    由模型得到向量化蒙特卡洛模拟引擎使用的循环活动描述和各类型的资源数量
+    
+    从第一个初始流实体所在的活动（没有初始流实体时为第一个活动）出发，
+    沿唯一的后继活动前进，直到回到出发的活动。
+    
+    参数:
+        model (Model): 模型对象
+    
+    返回:
+        tuple: (循环活动描述列表, 资源类型到资源数量的字典)，
+            循环活动描述为(活动ID, (最小值, 众数, 最大值), 资源类型或None)
+    
+    异常:
+        ValueError: 模型不是单一循环，或某个活动不能由向量化蒙特卡洛模拟引擎模拟时
+    """
+    start = _entry_activity(model)
+    
+    resource_counts = {}
+    for resource in model.initial_resources:
+        resource_counts[resource.type] = resource_counts.get(resource.type, 0) + 1
+    
+    cycle = []
+    activity_id = start
+    while True:
+        activity = model.get_activity(activity_id)
+        if activity is None or len(activity.successor_activities) != 1:
+            raise ValueError(f"Model {model.name} is not a single cycle of activities")
+        if activity.duration_function is not None or activity.duration_kind != 'triangular':
+            raise ValueError(f"Activity {activity.id} must use triangular duration_params")
+        if len(activity.required_resources) > 1 or activity.generated_resources \
+                or set(activity.released_resources) != set(activity.required_resources):
+            raise ValueError(f"Activity {activity.id} must use and release at most one resource")
+        resource_type = activity.required_resources[0] if activity.required_resources else None
+        if resource_type is not None and resource_type not in resource_counts:
+            raise ValueError(f"Model {model.name} has no resources of type {resource_type}")
+        cycle.append((activity.id, activity.duration_params, resource_type))
+        
+        activity_id = activity.successor_activities[0]
+        if activity_id == start:
+            break
+        if len(cycle) == len(model.activities):
+            raise ValueError(f"Model {model.name} is not a single cycle of activities")
+    
+    return cycle, resource_counts
+
+def _monte_carlo_sensitivity_case(cycle, resource_counts, num_trucks, n_reps, duration, seed):
+    """
+    使用向量化蒙特卡洛模拟引擎运行敏感性分析的单个工况
+    
+    参数:
+        cycle (list): 循环活动描述列表，每项为(活动ID, (最小值, 众数, 最大值), 资源类型或None)
+        resource_counts (dict): 资源类型到资源数量的映射
+        num_trucks (int): 卡车数量
+        n_reps (int): 重复模拟次数
+        duration (float): 模拟持续时间
+        seed (int): 随机数种子
+    
+    返回:
+        dict: 该工况的卡车数量、重复模拟的平均总体资源利用率和平均总完成次数
+    """
+    mc_engine = VectorizedMonteCarloEngine(cycle, resource_counts=resource_counts, seed=seed)
+    kpis = mc_engine.run(num_trucks, n_reps, duration)
+    
+    # 与单次模拟相同，总完成次数只计卸载活动
+    dump_columns = [i for i, (activity_id, _, _) in enumerate(cycle) if activity_id == 'dump']
+    return {
+        'num_trucks': num_trucks,
+        'overall_utilization': kpis['utilization'].mean(),
+        'total_completions': kpis['completion_counts'][:, dump_columns].sum(axis=1).mean()
+    }
+
+def sensitivity_analysis(model, parameter_ranges, output_dir, n_reps=None):
     """
     敏感性分析
     
@@ -270,6 +438,12 @@ def sensitivity_analysis(model, parameter_ranges, output_dir):
         model (Model): 模型对象
         parameter_ranges (dict): 参数范围字典
         output_dir (str): 输出目录
+        n_reps (int, optional): 重复模拟次数。如果指定，则使用向量化蒙特卡洛模拟引擎
+            计算每个工况在多次重复模拟下的平均值，循环活动和资源数量取自model，
+            model须为单一循环且活动持续时间服从三角分布；默认为None，即每个工况运行一次模拟
+    
+    异常:
+        ValueError: 指定n_reps而model不能由向量化蒙特卡洛模拟引擎模拟时
     """
     print("进行敏感性分析...")
     
@@ -279,53 +453,25 @@ def sensitivity_analysis(model, parameter_ranges, output_dir):
     # 分析卡车数量对系统性能的影响
     if 'num_trucks' in parameter_ranges:
         truck_range = parameter_ranges['num_trucks']
-        truck_results = []
         
-        for num_trucks in truck_range:
-            # 创建新模型
-            new_model = Model(name=f"土方工程模型（{num_trucks}辆卡车）")
-            
-            # 复制活动
-            for activity_id, activity in model.activities.items():
-                new_model.add_activity(activity)
-            
-            # 添加卡车
-            for i in range(num_trucks):
-                truck = FlowEntity(
-                    id=f"truck_{i}",
-                    activity_id="load",
-                    arrival_time=0
-                )
-                new_model.add_flow_entity(truck)
-            
-            # 复制资源
-            for resource in model.initial_resources:
-                new_model.add_resource(resource)
-            
-            # 运行模拟
-            engine = SimulationEngine(new_model)
-            engine.run(duration=480)
-            
-            # 获取统计数据
-            stats = SimulationStatistics(
-                activity_statistics=engine.statistics['activity_statistics'],
-                resource_statistics=engine.statistics['resource_statistics'],
-                total_simulation_time=engine.statistics['total_simulation_time']
-            )
-            
-            # 计算总体资源利用率
-            overall_utilization = stats.calculate_overall_resource_utilization()
-            
-            # 计算总完成次数
-            total_completions = sum(stats.activity_statistics[activity_id].completion_count 
-                                   for activity_id in stats.activity_statistics 
-                                   if activity_id == 'dump')
+        if n_reps:
+            # 所有重复模拟在同一组数组运算中完成
+            cycle, resource_counts = _model_cycle(model)
+            truck_results = [_monte_carlo_sensitivity_case(cycle, resource_counts, num_trucks, n_reps, 480,
+                                                           42 + num_trucks)
+                             for num_trucks in truck_range]
+        else:
+            # 向工作进程传递模型的活动（须可序列化，例如以duration_params给出持续时间）和资源的描述，
+            # 由工作进程创建就绪时间为0的新资源，并为每个工况分配不同的随机数种子
+            activities = list(model.activities.values())
+            entry_activity_id = _entry_activity(model)
+            resource_specs = [(r.id, r.type, r.disposable) for r in model.initial_resources]
+            cases = [(activities, entry_activity_id, num_trucks, resource_specs, 480, 42 + num_trucks)
+                     for num_trucks in truck_range]
             
-            truck_results.append({
-                'num_trucks': num_trucks,
-                'overall_utilization': overall_utilization,
-                'total_completions': total_completions
-            })
+            # 各工况相互独立，使用进程池并行运行
+            with multiprocessing.Pool() as pool:
+                truck_results = pool.map(_run_sensitivity_case, cases)
         
         # 绘制敏感性分析图表
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
@@ -376,7 +522,7 @@ def main():
     visualize_results(engine, stats, output_dir)
     
     # 敏感性分析
-    sensitivity_analysis(model, {'num_trucks': range(1, 11)}, output_dir)
+    sensitivity_analysis(model, {'num_trucks': range(1, 11)}, output_dir, n_reps=200)
     
     print("\n示例完成！所有结果已保存到：" + output_dir)
 
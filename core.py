@@ -5,6 +5,66 @@ SDESA Python库 - 核心模块
 流实体队列、资源实体队列、事件和事件日历等。
 """
 
+import heapq
+import itertools
+from collections import defaultdict, deque
+
+import numpy as np
+
+
+class IdRegistry:
+    """
+    ID注册表类
+    
+    在字符串ID和从0开始连续编号的整数ID之间双向映射。
+    整数ID与PYTHONHASHSEED无关，可以直接作为NumPy数组的下标或存入整数列，
+    只在输出结果时才需要转换回字符串。
+    """
+    
+    __slots__ = ('_ids', '_names')
+    
+    def __init__(self):
+        """初始化ID注册表"""
+        self._ids = {}
+        self._names = []
+    
+    def to_int(self, name):
+        """
+        获取字符串ID对应的整数ID，未注册的字符串ID会被分配下一个整数ID
+        
+        参数:
+            name (str): 字符串ID
+        
+        返回:
+            int: 整数ID
+        """
+        iid = self._ids.get(name)
+        if iid is None:
+            iid = self._ids[name] = len(self._names)
+            self._names.append(name)
+        return iid
+    
+    def to_str(self, iid):
+        """
+        获取整数ID对应的字符串ID
+        
+        参数:
+            iid (int): 整数ID
+        
+        返回:
+            str: 字符串ID
+        """
+        return self._names[iid]
+    
+    def __contains__(self, name):
+        """检查字符串ID是否已注册"""
+        return name in self._ids
+    
+    def __len__(self):
+        """返回已注册的ID数量"""
+        return len(self._names)
+
+
 class FlowEntity:
     """
     流实体类
@@ -18,8 +78,12 @@ class FlowEntity:
         arrival_time (float): 到达当前活动的时间
         departure_time (float): 离开当前活动的时间，初始为0表示未处理
         attributes (dict): 自定义属性字典
+    
+    流实体加入模型或由模拟引擎创建时会在ID注册表中登记，整数ID保存在_iid中，未登记时为-1。
     """
     
+    __slots__ = ('id', 'activity_id', 'arrival_time', 'departure_time', 'attributes', '_iid')
+    
     def __init__(self, id, activity_id, arrival_time=0, departure_time=0, attributes=None):
         """
         初始化流实体
@@ -36,6 +100,7 @@ class FlowEntity:
         self.arrival_time = arrival_time
         self.departure_time = departure_time
         self.attributes = attributes or {}
+        self._iid = -1
     
     def __str__(self):
         """返回流实体的字符串表示"""
@@ -67,8 +132,12 @@ class ResourceEntity:
         available (bool): 资源是否可用
         disposable (bool): 资源是否为一次性资源
         attributes (dict): 自定义属性字典
+    
+    资源实体加入模型或由模拟引擎创建时会在ID注册表中登记，整数ID保存在_iid中，未登记时为-1。
     """
     
+    __slots__ = ('id', 'type', 'ready_time', 'available', 'disposable', 'attributes', '_iid')
+    
     def __init__(self, id, type, ready_time=0, available=True, disposable=False, attributes=None):
         """
         初始化资源实体
@@ -87,6 +156,7 @@ class ResourceEntity:
         self.available = available
         self.disposable = disposable
         self.attributes = attributes or {}
+        self._iid = -1
     
     def __str__(self):
         """返回资源实体的字符串表示"""
@@ -100,6 +170,10 @@ class FlowEntityQueue:
     流实体队列用于存储和管理流实体。
     它提供了添加流实体、获取下一个未处理的流实体和更新流实体属性的方法。
     
+    队列维护一个按(到达时间, 加入顺序)排序的待处理最小堆，
+    模拟引擎通过pop_next_unprocessed依次取出待处理的流实体。
+    流实体的到达时间应通过update_entity更新，以便重新放入待处理堆。
+    
     属性:
         entities (list): 流实体列表
     """
@@ -107,15 +181,37 @@ class FlowEntityQueue:
     def __init__(self):
         """初始化流实体队列"""
         self.entities = []
+        self._by_id = {}
+        self._index = {}
+        self._pending = []
     
-    def add_entity(self, entity):
+    def add_entity(self, entity, pending=True):
         """
         添加流实体到队列
         
         参数:
             entity (FlowEntity): 要添加的流实体
+            pending (bool, optional): 是否将未处理的流实体放入待处理堆，默认为True。
+                调用者会立即处理该流实体时传入False，之后可通过requeue放回待处理堆
         """
+        row = len(self.entities)
+        self._index[entity.id] = row
         self.entities.append(entity)
+        self._by_id[entity.id] = entity
+        if pending and entity.departure_time == 0:
+            heapq.heappush(self._pending, (entity.arrival_time, row))
+    
+    def get_entity(self, entity_id):
+        """
+        获取流实体
+        
+        参数:
+            entity_id (str): 流实体ID
+        
+        返回:
+            FlowEntity or None: 指定ID的流实体，如果没有则返回None
+        """
+        return self._by_id.get(entity_id)
     
     def get_next_unprocessed(self):
         """
@@ -127,13 +223,47 @@ class FlowEntityQueue:
         返回:
             FlowEntity or None: 下一个未处理的流实体，如果没有则返回None
         """
-        unprocessed = [e for e in self.entities if e.departure_time == 0]
-        if not unprocessed:
-            return None
+        unprocessed = (e for e in self.entities if e.departure_time == 0)
+        return min(unprocessed, key=lambda e: e.arrival_time, default=None)
+    
+    def pop_next_unprocessed(self):
+        """
+        取出下一个待处理的流实体
+        
+        按照到达时间的先后顺序取出下一个未处理的流实体，并将其从待处理堆中移除。
+        到达时间相同的流实体按照加入队列的顺序取出。
+        
+        返回:
+            FlowEntity or None: 下一个待处理的流实体，如果没有则返回None
+        """
+        while self._pending:
+            arrival_time, row = heapq.heappop(self._pending)
+            entity = self.entities[row]
+            if entity.departure_time == 0 and entity.arrival_time == arrival_time:
+                return entity
+        return None
+    
+    def has_pending(self):
+        """
+        是否有待处理的流实体
+        
+        待处理堆中可能残留已经处理过的条目，因此结果为True时不一定能取出流实体。
+        
+        返回:
+            bool: 待处理堆不为空时为True
+        """
+        return bool(self._pending)
+    
+    def requeue(self, entity):
+        """
+        将流实体重新放回待处理堆
         
-        # 按照到达时间排序
-        unprocessed.sort(key=lambda e: e.arrival_time)
-        return unprocessed[0]
+        用于已经取出但暂时无法处理的流实体。
+        
+        参数:
+            entity (FlowEntity): 要放回的流实体
+        """
+        heapq.heappush(self._pending, (entity.arrival_time, self._index[entity.id]))
     
     def update_entity(self, entity_id, **kwargs):
         """
@@ -146,12 +276,14 @@ class FlowEntityQueue:
         返回:
             bool: 如果更新成功则为True，否则为False
         """
-        for entity in self.entities:
-            if entity.id == entity_id:
-                for key, value in kwargs.items():
-                    setattr(entity, key, value)
-                return True
-        return False
+        entity = self._by_id.get(entity_id)
+        if entity is None:
+            return False
+        for key, value in kwargs.items():
+            setattr(entity, key, value)
+        if 'arrival_time' in kwargs and entity.departure_time == 0:
+            heapq.heappush(self._pending, (entity.arrival_time, self._index[entity_id]))
+        return True
     
     def __len__(self):
         """返回队列中流实体的数量"""
@@ -169,6 +301,10 @@ class ResourceEntityQueue:
     资源实体队列用于存储和管理资源实体。
     它提供了添加资源实体、获取指定类型的资源和更新资源实体属性的方法。
     
+    每种资源类型维护一个按(准备就绪时间, 加入顺序)排序的最小堆。
+    资源属性变化时向堆中压入新条目，过期的条目在获取资源时惰性丢弃，
+    因此资源实体的属性应通过update_entity更新。
+    
     属性:
         entities (list): 资源实体列表
     """
@@ -176,6 +312,9 @@ class ResourceEntityQueue:
     def __init__(self):
         """初始化资源实体队列"""
         self.entities = []
+        self._by_id = {}
+        self._index = {}
+        self._by_type = defaultdict(list)
     
     def add_entity(self, entity):
         """
@@ -184,7 +323,27 @@ class ResourceEntityQueue:
         参数:
             entity (ResourceEntity): 要添加的资源实体
         """
+        self._index[entity.id] = len(self.entities)
         self.entities.append(entity)
+        self._by_id[entity.id] = entity
+        self._push(entity)
+    
+    def _push(self, entity):
+        """将可用资源的当前准备就绪时间压入其类型对应的堆"""
+        if entity.available:
+            heapq.heappush(self._by_type[entity.type], (entity.ready_time, self._index[entity.id]))
+    
+    def get_entity(self, entity_id):
+        """
+        获取资源实体
+        
+        参数:
+            entity_id (str): 资源实体ID
+        
+        返回:
+            ResourceEntity or None: 指定ID的资源实体，如果没有则返回None
+        """
+        return self._by_id.get(entity_id)
     
     def get_resource(self, type):
         """
@@ -198,13 +357,15 @@ class ResourceEntityQueue:
         返回:
             ResourceEntity or None: 指定类型的资源，如果没有则返回None
         """
-        available_resources = [r for r in self.entities if r.type == type and r.available]
-        if not available_resources:
-            return None
-        
-        # 按照准备就绪时间排序
-        available_resources.sort(key=lambda r: r.ready_time)
-        return available_resources[0]
+        heap = self._by_type.get(type)
+        while heap:
+            ready_time, index = heap[0]
+            resource = self.entities[index]
+            if resource.available and resource.type == type and resource.ready_time == ready_time:
+                return resource
+            # 丢弃过期的条目
+            heapq.heappop(heap)
+        return None
     
     def update_entity(self, entity_id, **kwargs):
         """
@@ -217,12 +378,13 @@ class ResourceEntityQueue:
         返回:
             bool: 如果更新成功则为True，否则为False
         """
-        for entity in self.entities:
-            if entity.id == entity_id:
-                for key, value in kwargs.items():
-                    setattr(entity, key, value)
-                return True
-        return False
+        entity = self._by_id.get(entity_id)
+        if entity is None:
+            return False
+        for key, value in kwargs.items():
+            setattr(entity, key, value)
+        self._push(entity)
+        return True
     
     def __len__(self):
         """返回队列中资源实体的数量"""
@@ -245,8 +407,13 @@ class Event:
         type (str): 事件类型（'begin_service'或'end_service'）
         entity_id (str): 相关流实体ID
         activity_id (str): 相关活动ID
+    
+    事件对象可以通过acquire从对象池中获取，并在不再被引用时通过release放回对象池，
+    以减少大量事件创建和回收的开销。
     """
     
+    __slots__ = ('time', 'type', 'entity_id', 'activity_id')
+    
     BEGIN_SERVICE = 'begin_service'
     END_SERVICE = 'end_service'
     
@@ -265,6 +432,40 @@ class Event:
         self.entity_id = entity_id
         self.activity_id = activity_id
     
+    @classmethod
+    def acquire(cls, time, type, entity_id, activity_id):
+        """
+        获取事件
+        
+        优先复用对象池中的事件对象，对象池为空时创建新的事件。
+        
+        参数:
+            time (float): 事件发生时间
+            type (str): 事件类型（'begin_service'或'end_service'）
+            entity_id (str): 相关流实体ID
+            activity_id (str): 相关活动ID
+        
+        返回:
+            Event: 事件对象
+        """
+        if cls is Event and _event_pool:
+            event = _event_pool.pop()
+            event.time = time
+            event.type = type
+            event.entity_id = entity_id
+            event.activity_id = activity_id
+            return event
+        return cls(time, type, entity_id, activity_id)
+    
+    def release(self):
+        """
+        释放事件
+        
+        将事件放回对象池以便复用。调用后不应再使用该事件对象。
+        """
+        if type(self) is Event:
+            _event_pool.append(self)
+    
     def __str__(self):
         """返回事件的字符串表示"""
         return f"Event(time={self.time}, type={self.type}, entity_id={self.entity_id}, activity_id={self.activity_id})"
@@ -274,6 +475,152 @@ class Event:
         return self.time < other.time
 
 
+# 可复用事件对象的对象池
+_event_pool = deque(maxlen=4096)
+
+
+class EventLog:
+    """
+    事件日志类
+    
+    以列的形式记录模拟过程中的服务开始和服务结束，而不保留事件对象：
+    每条记录为发生时间（float64）、事件类型代码（uint8）、流实体整数ID（int32）和活动整数ID（int32）。
+    各列预先分配容量，容量不足时扩大一倍。整数ID通过ID注册表转换回字符串ID。
+    
+    服务开始记录在流实体开始服务时写入，服务结束记录在服务结束时写入，
+    因此记录按写入顺序排列，而不一定按发生时间排序。
+    
+    属性:
+        registry (IdRegistry): 整数ID对应的ID注册表
+        times (numpy.ndarray): 发生时间列
+        types (numpy.ndarray): 事件类型代码列
+        entity_iids (numpy.ndarray): 流实体整数ID列
+        activity_iids (numpy.ndarray): 活动整数ID列
+    """
+    
+    BEGIN = 0
+    END = 1
+    
+    # 事件类型代码对应的事件类型
+    EVENT_TYPES = (Event.BEGIN_SERVICE, Event.END_SERVICE)
+    
+    def __init__(self, registry, capacity=1024):
+        """
+        初始化事件日志
+        
+        参数:
+            registry (IdRegistry): 整数ID对应的ID注册表
+            capacity (int, optional): 初始容量，默认为1024
+        """
+        self.registry = registry
+        self._times = np.empty(capacity, dtype=np.float64)
+        self._types = np.empty(capacity, dtype=np.uint8)
+        self._entity_iids = np.empty(capacity, dtype=np.int32)
+        self._activity_iids = np.empty(capacity, dtype=np.int32)
+        self._n = 0
+    
+    @classmethod
+    def from_events(cls, events):
+        """
+        由事件对象列表构造事件日志
+        
+        服务开始和服务结束以外的事件会被忽略。
+        
+        参数:
+            events (list): 事件列表
+        
+        返回:
+            EventLog: 事件日志，使用新建的ID注册表
+        """
+        log = cls(IdRegistry(), capacity=max(len(events), 16))
+        to_int = log.registry.to_int
+        codes = {event_type: code for code, event_type in enumerate(cls.EVENT_TYPES)}
+        for event in events:
+            code = codes.get(event.type)
+            if code is not None:
+                log.append(event.time, code, to_int(event.entity_id), to_int(event.activity_id))
+        return log
+    
+    def append(self, time, type_code, entity_iid, activity_iid):
+        """
+        追加一条记录
+        
+        参数:
+            time (float): 发生时间
+            type_code (int): 事件类型代码（EventLog.BEGIN或EventLog.END）
+            entity_iid (int): 流实体整数ID
+            activity_iid (int): 活动整数ID
+        """
+        n = self._n
+        if n == len(self._times):
+            self._grow()
+        self._times[n] = time
+        self._types[n] = type_code
+        self._entity_iids[n] = entity_iid
+        self._activity_iids[n] = activity_iid
+        self._n = n + 1
+    
+    def _grow(self):
+        """将各列的容量扩大一倍"""
+        capacity = max(2 * len(self._times), 16)
+        for name in ('_times', '_types', '_entity_iids', '_activity_iids'):
+            old = getattr(self, name)
+            column = np.empty(capacity, dtype=old.dtype)
+            column[:self._n] = old[:self._n]
+            setattr(self, name, column)
+    
+    @property
+    def times(self):
+        """发生时间列"""
+        return self._times[:self._n]
+    
+    @property
+    def types(self):
+        """事件类型代码列"""
+        return self._types[:self._n]
+    
+    @property
+    def entity_iids(self):
+        """流实体整数ID列"""
+        return self._entity_iids[:self._n]
+    
+    @property
+    def activity_iids(self):
+        """活动整数ID列"""
+        return self._activity_iids[:self._n]
+    
+    def __len__(self):
+        """返回记录数量"""
+        return self._n
+    
+    def __getitem__(self, index):
+        """
+        获取一条记录
+        
+        参数:
+            index (int): 记录位置
+        
+        返回:
+            Event: 由该记录构造的事件对象
+        """
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError("event log index out of range")
+        to_str = self.registry.to_str
+        return Event(float(self._times[index]), self.EVENT_TYPES[self._types[index]],
+                     to_str(int(self._entity_iids[index])), to_str(int(self._activity_iids[index])))
+    
+    def __iter__(self):
+        """按写入顺序逐条返回由记录构造的事件对象"""
+        for index in range(self._n):
+            yield self[index]
+    
+    def __str__(self):
+        """返回事件日志的字符串表示"""
+        return f"EventLog(records={self._n})"
+
+
 class EventCalendar:
     """
     事件日历类
@@ -281,24 +628,42 @@ class EventCalendar:
     事件日历用于存储和管理事件。
     它提供了安排事件、获取下一个事件和移除事件的方法。
     
+    事件日历基于二叉堆（heapq）实现，堆中的条目为[发生时间, 序号, 事件]，
+    序号单调递增，保证同一时间的事件按照安排的先后顺序处理，且无需比较事件对象本身。
+    移除事件采用惰性删除：被移除的条目只做标记，在出堆时跳过。
+    
     属性:
-        events (list): 事件列表
+        events (list): 事件堆，条目为[发生时间, 序号, 事件]
     """
     
+    # 被移除条目的占位标记
+    _REMOVED = object()
+    
     def __init__(self):
         """初始化事件日历"""
         self.events = []
+        self._entries = {}
+        self._counter = itertools.count()
     
     def schedule_event(self, event):
         """
         安排事件
         
+        如果事件已经在日历中，则先移除原有条目再重新安排。
+        
         参数:
             event (Event): 要安排的事件
         """
-        self.events.append(event)
-        # 按照事件发生时间排序
-        self.events.sort()
+        if event in self._entries:
+            self.remove_event(event)
+        entry = [event.time, next(self._counter), event]
+        self._entries[event] = entry
+        heapq.heappush(self.events, entry)
+    
+    def _discard_removed(self):
+        """丢弃堆顶已被移除的条目"""
+        while self.events and self.events[0][2] is self._REMOVED:
+            heapq.heappop(self.events)
     
     def get_next_event(self):
         """
@@ -307,9 +672,49 @@ class EventCalendar:
         返回:
             Event or None: 下一个事件，如果没有则返回None
         """
+        self._discard_removed()
+        if not self.events:
+            return None
+        return self.events[0][2]
+    
+    def pop_next_event(self):
+        """
+        取出下一个事件
+        
+        获取下一个事件并将其从日历中移除。
+        
+        返回:
+            Event or None: 下一个事件，如果没有则返回None
+        """
+        self._discard_removed()
         if not self.events:
             return None
-        return self.events[0]
+        event = heapq.heappop(self.events)[2]
+        del self._entries[event]
+        return event
+    
+    def pop_next_batch(self):
+        """
+        取出下一批事件
+        
+        取出下一个事件，以及紧随其后、发生时间、事件类型和活动ID都与之相同的事件，
+        以便模拟引擎成批处理。
+        
+        返回:
+            list: 按安排顺序排列的事件列表，如果没有事件则返回空列表
+        """
+        event = self.pop_next_event()
+        if event is None:
+            return []
+        
+        batch = [event]
+        while True:
+            next_event = self.get_next_event()
+            if (next_event is None or next_event.time != event.time
+                    or next_event.type != event.type or next_event.activity_id != event.activity_id):
+                break
+            batch.append(self.pop_next_event())
+        return batch
     
     def remove_event(self, event):
         """
@@ -321,18 +726,19 @@ class EventCalendar:
         返回:
             bool: 如果移除成功则为True，否则为False
         """
-        if event in self.events:
-            self.events.remove(event)
-            return True
-        return False
+        entry = self._entries.pop(event, None)
+        if entry is None:
+            return False
+        entry[2] = self._REMOVED
+        return True
     
     def __len__(self):
         """返回日历中事件的数量"""
-        return len(self.events)
+        return len(self._entries)
     
     def __str__(self):
         """返回事件日历的字符串表示"""
-        return f"EventCalendar(events={len(self.events)})"
+        return f"EventCalendar(events={len(self)})"
 
 
 class SimulationClock:
@@ -345,6 +751,8 @@ class SimulationClock:
         current_time (float): 当前模拟时间
     """
     
+    __slots__ = ('current_time',)
+    
     def __init__(self, initial_time=0):
         """
         初始化模拟时钟
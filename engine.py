@@ -4,8 +4,14 @@ SDESA Python库 - 模拟引擎模块
 该模块包含SDESA的模拟引擎，负责执行模拟过程。
 """
 
-from .core import Event, EventCalendar, SimulationClock, FlowEntityQueue, ResourceEntityQueue
-from .model import Model
+import os
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import FlowEntity, ResourceEntity, Event, EventCalendar, EventLog, SimulationClock, FlowEntityQueue, ResourceEntityQueue
+from .utils import BufferedRNG, RandomGenerator
 
 
 class SimulationEngine:
@@ -22,36 +28,103 @@ class SimulationEngine:
         resource_entity_queue (ResourceEntityQueue): 资源实体队列
         event_calendar (EventCalendar): 事件日历
         clock (SimulationClock): 模拟时钟
-        event_log (list): 事件日志
+        event_log (EventLog): 事件日志，按列记录服务开始和服务结束
+        record_events (bool): 是否记录事件日志
         statistics (dict): 模拟统计数据
+    
+    对于以分布参数给出持续时间的活动，模拟引擎使用自己的缓冲随机数生成器（BufferedRNG）
+    每次成批抽取DURATION_CHUNK个持续时间，依次取用，用完后再补充。
+    
+    模拟过程中的资源忙碌时间段以及活动等待时间和服务时间记录在容量按倍数增长的
+    两列float64数组中，模拟结束时以NumPy数组的形式写入statistics。
     """
     
-    def __init__(self, model):
+    # 每次成批抽取的活动持续时间数量
+    DURATION_CHUNK = 4096
+    
+    # 统计数组的初始容量
+    STATISTICS_CAPACITY = 64
+    
+    def __init__(self, model, record_events=True, seed=None):
         """
         初始化模拟引擎
         
         参数:
             model (Model): 模拟模型
+            record_events (bool, optional): 是否记录事件日志，默认为True
+            seed (int, optional): 成批抽取活动持续时间所用的随机数种子，默认为None，
+                此时种子取自NumPy的全局随机状态，因此RandomGenerator.set_seed同样保证结果可重现
         """
         self.model = model
+        self.record_events = record_events
+        if seed is None:
+            seed = np.random.randint(0, 2**32 - 1, dtype=np.int64)
+        self._rng = BufferedRNG(seed, size=self.DURATION_CHUNK)
         self.flow_entity_queue = FlowEntityQueue()
         self.resource_entity_queue = ResourceEntityQueue()
         self.event_calendar = EventCalendar()
         self.clock = SimulationClock()
-        self.event_log = []
+        self.event_log = EventLog(model.id_registry)
         self.statistics = {
             'activity_statistics': {},
             'resource_statistics': {},
             'total_simulation_time': 0
         }
+        
+        # 活动查找表，在initialize中根据模型生成
+        self._activities = {}
+        self._required_resources = {}
+        self._released_resources = {}
+        self._duration_pools = {}
+        
+        # 当前运行的模拟持续时间
+        self._run_duration = float('inf')
+        
+        # 因缺少资源而无法开始服务的流实体，按所缺资源类型分组
+        self._blocked_by_type = defaultdict(deque)
+        
+        # 处理服务结束时尚未创建的后继流实体，元素为(流实体, 后继活动)；不在处理服务结束时为None
+        self._successor_stack = None
+        
+        # 统计数组，值为[两列数组, 已写入行数]
+        self._busy_periods = {}
+        self._service_records = {}
     
     def initialize(self):
         """
         初始化模拟
         
-        初始化流实体队列、资源实体队列和事件日历。
+        初始化流实体队列、资源实体队列和事件日历，
+        并预先生成活动及其所需资源和释放资源的查找表。
+        模型先经Model.freeze验证并解析后继活动，模型无效时抛出ValueError。
         """
+        # 验证模型并解析后继活动，生成活动查找表
+        self.model.freeze()
+        self._activities = dict(self.model.activities)
+        self._required_resources = {
+            activity_id: tuple(activity.required_resources)
+            for activity_id, activity in self._activities.items()
+        }
+        self._released_resources = {
+            activity_id: frozenset(activity.released_resources)
+            for activity_id, activity in self._activities.items()
+        }
+        
+        # 以分布参数给出持续时间的活动使用成批抽取持续时间的随机数函数
+        self._duration_pools = {
+            activity_id: self._rng.sampler(activity.duration_kind, *activity.duration_params)
+            for activity_id, activity in self._activities.items()
+            if activity.duration_function is None
+        }
+        
+        # 登记未经Model.add_*加入模型的活动、流实体和资源
+        register = self.model.register
+        for obj in (*self._activities.values(), *self.model.initial_flow_entities, *self.model.initial_resources):
+            if obj._iid < 0:
+                register(obj)
+        
         # 初始化流实体队列
+        self._blocked_by_type = defaultdict(deque)
         for entity in self.model.initial_flow_entities:
             self.flow_entity_queue.add_entity(entity)
         
@@ -60,19 +133,23 @@ class SimulationEngine:
             self.resource_entity_queue.add_entity(resource)
         
         # 初始化活动统计
+        self._service_records = {}
+        self._busy_periods = {}
         for activity_id in self.model.activities:
             self.statistics['activity_statistics'][activity_id] = {
                 'completion_count': 0,
-                'waiting_times': [],
-                'service_times': []
+                'waiting_times': np.empty(0),
+                'service_times': np.empty(0)
             }
+            self._service_records[activity_id] = [np.empty((self.STATISTICS_CAPACITY, 2)), 0]
         
         # 初始化资源统计
         for resource in self.model.initial_resources:
             self.statistics['resource_statistics'][resource.id] = {
-                'busy_periods': [],
-                'idle_periods': []
+                'busy_periods': np.empty((0, 2)),
+                'idle_periods': np.empty((0, 2))
             }
+            self._busy_periods[resource.id] = [np.empty((self.STATISTICS_CAPACITY, 2)), 0]
     
     def run(self, duration=float('inf')):
         """
@@ -85,131 +162,251 @@ class SimulationEngine:
             dict: 模拟统计数据
         """
         # 初始化模拟
+        self._run_duration = duration
         self.initialize()
         
         # 处理初始流实体
-        next_entity = self.flow_entity_queue.get_next_unprocessed()
-        while next_entity and self.clock.current_time < duration:
-            self.process_begin_service_event(next_entity)
-            next_entity = self.flow_entity_queue.get_next_unprocessed()
+        self.process_pending_entities(duration)
+        
+        # 主模拟循环中反复使用的对象和方法预先绑定为局部变量
+        event_calendar = self.event_calendar
+        clock = self.clock
+        pop_next_batch = event_calendar.pop_next_batch
+        process_event_batch = self.process_event_batch
+        process_pending_entities = self.process_pending_entities
         
         # 主模拟循环
-        while self.event_calendar.events and self.clock.current_time < duration:
-            next_event = self.event_calendar.get_next_event()
-            self.event_calendar.remove_event(next_event)
+        while event_calendar and clock.current_time < duration:
+            events = pop_next_batch()
             
             # 推进模拟时钟
-            self.clock.advance(next_event.time)
-            
-            # 记录事件
-            self.event_log.append(next_event)
+            clock.advance(events[0].time)
             
             # 处理事件
-            if next_event.type == Event.BEGIN_SERVICE:
-                # 查找对应的流实体
-                for entity in self.flow_entity_queue.entities:
-                    if entity.id == next_event.entity_id and entity.activity_id == next_event.activity_id:
-                        self.process_begin_service_event(entity)
-                        break
-            elif next_event.type == Event.END_SERVICE:
-                # 查找对应的流实体
-                for entity in self.flow_entity_queue.entities:
-                    if entity.id == next_event.entity_id and entity.activity_id == next_event.activity_id:
-                        self.process_end_service_event(entity)
-                        break
+            process_event_batch(events)
+            
+            # 事件已记录到事件日志，将事件放回对象池
+            for event in events:
+                event.release()
             
-            # 处理下一个未处理的流实体
-            next_entity = self.flow_entity_queue.get_next_unprocessed()
-            while next_entity and self.clock.current_time < duration:
-                self.process_begin_service_event(next_entity)
-                next_entity = self.flow_entity_queue.get_next_unprocessed()
+            # 处理待处理的流实体
+            process_pending_entities(duration)
         
         # 记录总模拟时间
         self.statistics['total_simulation_time'] = self.clock.current_time
         
+        # 将统计数组写入模拟统计数据
+        self._publish_statistics()
+        
         return self.statistics
     
-    def process_begin_service_event(self, entity):
+    def process_event_batch(self, events):
+        """
+        处理一批事件
+        
+        同一批事件的发生时间、事件类型和活动ID都相同，
+        因此只需确定一次事件处理方法，再依次处理每个事件对应的流实体。
+        
+        参数:
+            events (list): 事件列表
+        """
+        event_type = events[0].type
+        activity_id = events[0].activity_id
+        if event_type == Event.BEGIN_SERVICE:
+            handler = self.process_begin_service_event
+        elif event_type == Event.END_SERVICE:
+            handler = self.process_end_service_event
+        else:
+            return
+        
+        get_entity = self.flow_entity_queue.get_entity
+        for event in events:
+            # 查找对应的流实体
+            entity = get_entity(event.entity_id)
+            if entity is not None and entity.activity_id == activity_id:
+                handler(entity)
+    
+    def process_pending_entities(self, duration=float('inf')):
+        """
+        处理待处理的流实体
+        
+        按照到达时间的先后顺序取出待处理的流实体并尝试开始服务。
+        因缺少资源而无法开始服务的流实体由process_begin_service_event按所缺资源类型登记，
+        直到生成该类型的资源时才被放回待处理队列，不会在每个事件后重复尝试。
+        
+        参数:
+            duration (float, optional): 模拟持续时间，默认为无限
+        """
+        clock = self.clock
+        pop_next_unprocessed = self.flow_entity_queue.pop_next_unprocessed
+        process_begin_service_event = self.process_begin_service_event
+        
+        while clock.current_time < duration:
+            entity = pop_next_unprocessed()
+            if entity is None:
+                break
+            process_begin_service_event(entity)
+    
+    def process_begin_service_event(self, entity, activity=None):
         """
         处理服务开始事件
         
+        持续时间为0且在当前时刻结束的服务直接处理服务结束，不安排服务结束事件。
+        因缺少资源而无法开始服务的流实体登记为等待所缺类型的资源。
+        
         参数:
             entity (FlowEntity): 要处理的流实体
+            activity (Activity, optional): 流实体所在的活动，默认为None，表示按流实体的活动ID查找
         
         返回:
             bool: 如果处理成功则为True，否则为False
         """
         # 获取活动
-        activity = self.model.get_activity(entity.activity_id)
-        if not activity:
-            return False
-        
-        # 如果活动不需要资源，直接处理
-        if not activity.required_resources:
-            # 设置开始时间为到达时间
-            begin_time = entity.arrival_time
-            
-            # 生成活动持续时间
-            duration = activity.get_duration()
-            
-            # 计算结束时间
-            end_time = begin_time + duration
-            
-            # 安排服务结束事件
-            end_event = Event(end_time, Event.END_SERVICE, entity.id, entity.activity_id)
-            self.event_calendar.schedule_event(end_event)
-            
-            # 记录统计数据
-            self.statistics['activity_statistics'][activity.id]['waiting_times'].append(0)
-            self.statistics['activity_statistics'][activity.id]['service_times'].append(duration)
-            
-            return True
+        if activity is None:
+            activity = self._activities.get(entity.activity_id)
+            if not activity:
+                return False
         
-        # 尝试获取所需资源
+        # 尝试获取所需资源，同时计算开始时间（到达时间与各资源就绪时间中的最大值）
+        resource_entity_queue = self.resource_entity_queue
+        begin_time = entity.arrival_time
         required_resources = []
-        for resource_type in activity.required_resources:
-            resource = self.resource_entity_queue.get_resource(resource_type)
+        for resource_type in self._required_resources[activity.id]:
+            resource = resource_entity_queue.get_resource(resource_type)
             if not resource:
-                # 如果无法获取所需资源，返回False
+                # 如果无法获取所需资源，登记为等待该类型资源，返回False
+                self._blocked_by_type[resource_type].append(entity)
                 return False
             required_resources.append(resource)
-        
-        # 计算开始时间
-        begin_time = max(entity.arrival_time, max(r.ready_time for r in required_resources))
+            if resource.ready_time > begin_time:
+                begin_time = resource.ready_time
         
         # 生成活动持续时间
-        duration = activity.get_duration()
+        duration = self._get_duration(activity)
         
         # 计算结束时间
         end_time = begin_time + duration
         
         # 更新资源就绪时间
+        released_resources = self._released_resources[activity.id]
+        append_busy = self._append_busy
         for resource in required_resources:
             # 记录资源忙碌时间段
-            self.statistics['resource_statistics'][resource.id]['busy_periods'].append((begin_time, end_time))
+            append_busy(resource.id, begin_time, end_time)
             
             # 如果资源在活动结束后释放，更新就绪时间
-            if resource.type in activity.released_resources:
-                self.resource_entity_queue.update_entity(resource.id, ready_time=end_time)
+            if resource.type in released_resources:
+                resource_entity_queue.update_entity(resource.id, ready_time=end_time)
             # 如果资源是一次性资源，标记为不可用
             elif resource.disposable:
-                self.resource_entity_queue.update_entity(resource.id, available=False)
+                resource_entity_queue.update_entity(resource.id, available=False)
+        
+        # 记录统计数据
+        self._append_service(activity.id, begin_time - entity.arrival_time, duration)
+        if self.record_events:
+            self.event_log.append(begin_time, EventLog.BEGIN, entity._iid, activity._iid)
+        
+        # 在当前时刻立即结束的活动（持续时间为0）直接处理服务结束，不经过事件日历；
+        # 其后继流实体由最外层的process_end_service_event依次创建，不会逐层递归
+        if duration == 0 and end_time == self.clock.current_time:
+            self.process_end_service_event(entity)
+            return True
         
         # 安排服务结束事件
-        end_event = Event(end_time, Event.END_SERVICE, entity.id, entity.activity_id)
+        end_event = Event.acquire(end_time, Event.END_SERVICE, entity.id, entity.activity_id)
         self.event_calendar.schedule_event(end_event)
         
-        # 记录统计数据
-        waiting_time = begin_time - entity.arrival_time
-        self.statistics['activity_statistics'][activity.id]['waiting_times'].append(waiting_time)
-        self.statistics['activity_statistics'][activity.id]['service_times'].append(duration)
-        
         return True
     
+    @staticmethod
+    def _append_row(records, key, first, second):
+        """
+        向统计数组追加一行，容量不足时按倍数扩容
+        
+        参数:
+            records (dict): 统计数组字典，值为[两列数组, 已写入行数]
+            key (str): 资源ID或活动ID
+            first (float): 第一列的值
+            second (float): 第二列的值
+        """
+        record = records.get(key)
+        if record is None:
+            record = records[key] = [np.empty((SimulationEngine.STATISTICS_CAPACITY, 2)), 0]
+        array, n = record
+        if n == len(array):
+            grown = np.empty((2 * n, 2))
+            grown[:n] = array
+            array = record[0] = grown
+        array[n, 0] = first
+        array[n, 1] = second
+        record[1] = n + 1
+    
+    def _append_busy(self, resource_id, begin_time, end_time):
+        """
+        记录资源忙碌时间段
+        
+        参数:
+            resource_id (str): 资源ID
+            begin_time (float): 开始时间
+            end_time (float): 结束时间
+        """
+        self._append_row(self._busy_periods, resource_id, begin_time, end_time)
+    
+    def _append_service(self, activity_id, waiting_time, service_time):
+        """
+        记录活动的等待时间和服务时间
+        
+        参数:
+            activity_id (str): 活动ID
+            waiting_time (float): 等待时间
+            service_time (float): 服务时间
+        """
+        self._append_row(self._service_records, activity_id, waiting_time, service_time)
+    
+    def _publish_statistics(self):
+        """
+        将统计数组截取为实际长度并写入模拟统计数据
+        
+        忙碌时间段为形状(n, 2)的数组，每行为(开始时间, 结束时间)；
+        等待时间和服务时间为一维数组。
+        """
+        resource_statistics = self.statistics['resource_statistics']
+        for resource_id, (array, n) in self._busy_periods.items():
+            stats = resource_statistics.setdefault(resource_id, {'idle_periods': np.empty((0, 2))})
+            stats['busy_periods'] = array[:n].copy()
+        
+        activity_statistics = self.statistics['activity_statistics']
+        for activity_id, (array, n) in self._service_records.items():
+            stats = activity_statistics[activity_id]
+            stats['waiting_times'] = array[:n, 0].copy()
+            stats['service_times'] = array[:n, 1].copy()
+    
+    def _get_duration(self, activity):
+        """
+        获取活动持续时间
+        
+        以分布参数给出持续时间的活动从成批抽取的持续时间中依次取用；
+        其他活动调用其持续时间函数。
+        
+        参数:
+            activity (Activity): 活动
+        
+        返回:
+            float: 活动持续时间
+        """
+        sample = self._duration_pools.get(activity.id)
+        if sample is None:
+            return activity.get_duration()
+        return sample()
+    
     def process_end_service_event(self, entity):
         """
         处理服务结束事件
         
+        后继活动的流实体在没有其他待处理的流实体、也没有流实体在等待其所需类型的资源时直接尝试开始服务；
+        否则放入待处理队列，按到达时间排在先到的流实体之后，保证先到先服务。
+        后继活动按深度优先的顺序从一个栈中依次创建，持续时间为0的活动组成的长链不会导致递归过深。
+        
         参数:
             entity (FlowEntity): 要处理的流实体
         
@@ -217,7 +414,7 @@ class SimulationEngine:
             bool: 如果处理成功则为True，否则为False
         """
         # 获取活动
-        activity = self.model.get_activity(entity.activity_id)
+        activity = self._activities.get(entity.activity_id)
         if not activity:
             return False
         
@@ -229,8 +426,11 @@ class SimulationEngine:
         
         # 增加活动完成计数
         self.statistics['activity_statistics'][activity.id]['completion_count'] += 1
+        if self.record_events:
+            self.event_log.append(event_time, EventLog.END, entity._iid, activity._iid)
         
         # 生成一次性资源
+        register = self.model.register
         for resource_type in activity.generated_resources:
             resource_id = f"{resource_type}_{len(self.resource_entity_queue.entities)}"
             resource = ResourceEntity(
@@ -240,21 +440,67 @@ class SimulationEngine:
                 available=True,
                 disposable=True
             )
+            register(resource)
             self.resource_entity_queue.add_entity(resource)
+            self._wake_blocked(resource_type)
         
-        # 创建后继活动的流实体
-        for successor_id in activity.successor_activities:
-            new_entity_id = f"{entity.id}_{successor_id}"
-            new_entity = FlowEntity(
-                id=new_entity_id,
-                activity_id=successor_id,
-                arrival_time=event_time,
-                departure_time=0
-            )
-            self.flow_entity_queue.add_entity(new_entity)
+        # 后继活动逆序入栈，出栈顺序与后继活动列表相同；
+        # 已在处理服务结束时（持续时间为0的后继活动）只入栈，由最外层的调用处理
+        successors = [(entity, successor) for successor in reversed(activity._resolved_successors)]
+        if self._successor_stack is not None:
+            self._successor_stack.extend(successors)
+            return True
+        
+        stack = self._successor_stack = successors
+        try:
+            while stack:
+                self._begin_successor(*stack.pop())
+        finally:
+            self._successor_stack = None
         
         return True
     
+    def _begin_successor(self, entity, successor):
+        """
+        创建后继活动的流实体，在模拟持续时间内且不会越过先到的流实体时直接尝试开始服务
+        
+        参数:
+            entity (FlowEntity): 完成服务的流实体
+            successor (Activity): 后继活动
+        """
+        event_time = self.clock.current_time
+        flow_entity_queue = self.flow_entity_queue
+        new_entity = FlowEntity(
+            id=f"{entity.id}_{successor.id}",
+            activity_id=successor.id,
+            arrival_time=event_time,
+            departure_time=0
+        )
+        self.model.register(new_entity)
+        if (event_time < self._run_duration and not flow_entity_queue.has_pending()
+                and not any(self._blocked_by_type.get(t) for t in self._required_resources[successor.id])):
+            flow_entity_queue.add_entity(new_entity, pending=False)
+            self.process_begin_service_event(new_entity, successor)
+        else:
+            flow_entity_queue.add_entity(new_entity)
+    
+    def _wake_blocked(self, resource_type):
+        """
+        唤醒所有等待指定类型资源的流实体
+        
+        等待的流实体全部放回待处理队列，由process_pending_entities按到达时间顺序重新尝试开始服务，
+        没有取得资源的流实体重新登记。只唤醒一个流实体时，如果它转而等待另一种资源，
+        新增的资源会一直空闲，其余等待该类型资源的流实体也不会被唤醒。
+        
+        参数:
+            resource_type (str): 新增资源的类型
+        """
+        blocked = self._blocked_by_type.pop(resource_type, None)
+        if blocked:
+            requeue = self.flow_entity_queue.requeue
+            for entity in blocked:
+                requeue(entity)
+    
     def get_activity_statistics(self, activity_id):
         """
         获取活动统计数据
@@ -290,8 +536,216 @@ class SimulationEngine:
             float: 资源利用率（0-1之间的值）
         """
         resource_stats = self.get_resource_statistics(resource_id)
-        if not resource_stats or not resource_stats.get('busy_periods'):
+        if not resource_stats or len(resource_stats.get('busy_periods', ())) == 0:
             return 0.0
         
-        total_busy_time = sum(end - start for start, end in resource_stats['busy_periods'])
+        busy = resource_stats['busy_periods']
+        total_busy_time = (busy[:, 1] - busy[:, 0]).sum()
         return total_busy_time / self.statistics['total_simulation_time'] if self.statistics['total_simulation_time'] > 0 else 0.0
+
+
+class VectorizedMonteCarloEngine:
+    """
+    向量化蒙特卡洛模拟引擎类
+    
+    适用于单一循环流程的模型，例如土方工程中的装载→运输→卸载→返回：
+    每个流实体依次循环经过各个活动，每个活动至多占用一个指定类型的资源并在结束时释放，
+    活动持续时间服从三角分布。
+    
+    所有重复模拟（replication）作为NumPy数组的第一维同时推进：
+    每一步在每个重复模拟中取出最早到达下一活动的流实体，
+    按照与SimulationEngine相同的规则（开始时间为到达时间与资源就绪时间中的最大值）计算开始和结束时间。
+    活动持续时间按块预先抽样为形状为(块大小, 重复次数, 活动数)的数组。
+    
+    属性:
+        cycle (list): 循环活动描述列表，每项为(活动ID, (最小值, 众数, 最大值), 资源类型或None)
+        resource_types (list): 循环中用到的资源类型列表
+        resource_counts (dict): 资源类型到资源数量的映射
+        block_size (int): 每次预先抽样的步数
+    """
+    
+    def __init__(self, cycle, resource_counts=None, seed=None, block_size=256):
+        """
+        初始化向量化蒙特卡洛模拟引擎
+        
+        参数:
+            cycle (list): 循环活动描述列表，每项为(活动ID, (最小值, 众数, 最大值), 资源类型或None)
+            resource_counts (dict, optional): 资源类型到资源数量的映射，默认为每种类型1个
+            seed (int, optional): 随机数种子，默认为None
+            block_size (int, optional): 每次预先抽样的步数，默认为256
+        """
+        if not cycle:
+            raise ValueError("cycle must contain at least one activity")
+        
+        self.cycle = list(cycle)
+        self.resource_types = []
+        for _, _, resource_type in self.cycle:
+            if resource_type is not None and resource_type not in self.resource_types:
+                self.resource_types.append(resource_type)
+        self.resource_counts = {t: 1 for t in self.resource_types}
+        self.resource_counts.update(resource_counts or {})
+        self.block_size = block_size
+        self._rng = np.random.default_rng(seed)
+        
+        # 各活动的三角分布参数和资源类型下标（-1表示不需要资源）
+        params = np.array([p for _, p, _ in self.cycle], dtype=np.float64)
+        if np.any(params[:, 0] >= params[:, 2]) or np.any(params[:, 1] < params[:, 0]) or np.any(params[:, 1] > params[:, 2]):
+            raise ValueError("triangular parameters must satisfy min <= mode <= max and min < max")
+        self._low, self._mode, self._high = params[:, 0], params[:, 1], params[:, 2]
+        self._resource_index = np.array(
+            [self.resource_types.index(t) if t is not None else -1 for _, _, t in self.cycle],
+            dtype=np.int64
+        )
+    
+    def _sample_block(self, n_reps):
+        """预先抽样一块活动持续时间，形状为(块大小, 重复次数, 活动数)"""
+        size = (self.block_size, n_reps, len(self.cycle))
+        return self._rng.triangular(self._low, self._mode, self._high, size=size)
+    
+    def run(self, num_entities, n_reps, duration):
+        """
+        运行蒙特卡洛模拟
+        
+        参数:
+            num_entities (int): 流实体数量，所有流实体在时间0到达第一个活动
+            n_reps (int): 重复模拟次数
+            duration (float): 模拟持续时间
+        
+        返回:
+            dict: 每个重复模拟的关键指标，包括：
+                completion_counts (numpy.ndarray): 形状为(重复次数, 活动数)的完成次数
+                busy_times (numpy.ndarray): 形状为(重复次数, 资源类型数)的资源忙碌总时间
+                utilization (numpy.ndarray): 形状为(重复次数, 资源类型数)的资源利用率
+        """
+        if not np.isfinite(duration):
+            raise ValueError("duration must be finite")
+        
+        n_activities = len(self.cycle)
+        reps = np.arange(n_reps)
+        
+        # 每个流实体到达下一活动的时间及其所处的活动下标
+        next_times = np.zeros((n_reps, num_entities))
+        stages = np.zeros((n_reps, num_entities), dtype=np.int64)
+        
+        # 每种资源类型中各资源的就绪时间
+        ready_times = [np.zeros((n_reps, self.resource_counts[t])) for t in self.resource_types]
+        
+        completion_counts = np.zeros((n_reps, n_activities), dtype=np.int64)
+        busy_times = np.zeros((n_reps, len(self.resource_types)))
+        
+        block = self._sample_block(n_reps)
+        step = 0
+        while True:
+            # 每个重复模拟中取出最早到达的流实体
+            entity = np.argmin(next_times, axis=1)
+            arrival = next_times[reps, entity]
+            active = arrival < duration
+            if not active.any():
+                break
+            
+            if step == self.block_size:
+                block = self._sample_block(n_reps)
+                step = 0
+            stage = stages[reps, entity]
+            service = block[step, reps, stage]
+            step += 1
+            
+            # 开始时间为到达时间与所需资源就绪时间中的最大值
+            begin = arrival.copy()
+            resource_index = self._resource_index[stage]
+            for r, ready in enumerate(ready_times):
+                uses = active & (resource_index == r)
+                if not uses.any():
+                    continue
+                rows = reps[uses]
+                unit = np.argmin(ready[rows], axis=1)
+                begin[rows] = np.maximum(arrival[rows], ready[rows, unit])
+                end = begin[rows] + service[rows]
+                ready[rows, unit] = end
+                busy_times[rows, r] += service[rows]
+            end = begin + service
+            
+            completion_counts[reps, stage] += active & (end <= duration)
+            next_times[reps, entity] = np.where(active, end, np.inf)
+            stages[reps, entity] = (stage + 1) % n_activities
+        
+        units = np.array([self.resource_counts[t] for t in self.resource_types], dtype=np.float64)
+        return {
+            'completion_counts': completion_counts,
+            'busy_times': busy_times,
+            'utilization': busy_times / (units * duration)
+        }
+
+
+def _run_replication(args):
+    """
+    运行一次重复模拟（进程池工作函数）
+    
+    参数:
+        args (tuple): (模型工厂函数, 随机数种子, 模拟持续时间)
+    
+    返回:
+        tuple: (指标名称列表, 指标值列表)
+    """
+    model_factory, seed, duration = args
+    RandomGenerator.set_seed(seed)
+    model = model_factory()
+    engine = SimulationEngine(model, record_events=False, seed=seed)
+    statistics = engine.run(duration)
+    
+    names = ['total_simulation_time']
+    values = [statistics['total_simulation_time']]
+    for activity_id, stats in statistics['activity_statistics'].items():
+        names.append(f"{activity_id}.completion_count")
+        values.append(stats['completion_count'])
+    for resource in model.initial_resources:
+        names.append(f"{resource.id}.utilization")
+        values.append(engine.calculate_resource_utilization(resource.id))
+    return names, values
+
+
+def run_replications(model_factory, n_reps, duration, seeds=None, n_workers=None, percentiles=(5, 50, 95)):
+    """
+    使用多个进程并行运行重复模拟
+    
+    每次重复模拟在工作进程中调用model_factory重新构建模型，
+    并使用不同的随机数种子（同时用于RandomGenerator和模拟引擎）运行SimulationEngine。
+    model_factory必须可以被pickle，例如模块级函数或functools.partial。
+    
+    每次重复模拟记录的指标为总模拟时间、各活动的完成次数和各初始资源的利用率。
+    
+    参数:
+        model_factory (callable): 无参数的模型工厂函数，返回Model对象
+        n_reps (int): 重复模拟次数
+        duration (float): 模拟持续时间
+        seeds (list, optional): 每次重复模拟的随机数种子，默认为None，此时从NumPy的全局随机状态生成
+        n_workers (int, optional): 工作进程数，默认为None，即CPU核心数
+        percentiles (tuple, optional): 要计算的百分位数，默认为(5, 50, 95)
+    
+    返回:
+        dict: 包含以下键的字典
+            'kpi_names' (list): 指标名称列表
+            'values' (numpy.ndarray): 形状为(重复次数, 指标数)的指标值数组
+            'mean' (numpy.ndarray): 各指标的均值
+            'percentiles' (dict): 百分位数字典，键为百分位数，值为各指标对应的数组
+    """
+    if seeds is None:
+        seeds = np.random.randint(0, 2**32 - 1, size=n_reps, dtype=np.int64)
+    seeds = [int(seed) for seed in seeds]
+    if len(seeds) != n_reps:
+        raise ValueError("seeds must contain exactly n_reps values")
+    n_workers = n_workers or os.cpu_count() or 1
+    
+    tasks = [(model_factory, seed, duration) for seed in seeds]
+    chunksize = max(1, n_reps // (4 * n_workers))
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = list(executor.map(_run_replication, tasks, chunksize=chunksize))
+    
+    kpi_names = results[0][0] if results else []
+    values = np.array([row for _, row in results], dtype=np.float64).reshape(n_reps, len(kpi_names))
+    return {
+        'kpi_names': kpi_names,
+        'values': values,
+        'mean': values.mean(axis=0),
+        'percentiles': {p: np.percentile(values, p, axis=0) for p in percentiles}
+    }
@@ -2,8 +2,17 @@
 SDESA Python库 - 模型模块
 
 该模块包含SDESA的模型定义和构建功能，包括活动和模型类。
+
+活动ID在创建活动时用sys.intern驻留，以ID为键的字典查找可以直接比较对象身份；
+按动态拼接的ID查找活动时，先对ID调用sys.intern可以获得同样的效果。
 """
 
+import sys
+
+from .core import IdRegistry
+from .utils import BufferedRNG, RandomGenerator
+
+
 class Activity:
     """
     活动类
@@ -12,6 +21,10 @@ class Activity:
     每个活动都有一个唯一的ID，活动名称，持续时间函数，所需资源列表，
     释放资源列表，生成资源列表和后继活动列表。
     
+    活动持续时间可以由持续时间函数给出，也可以由分布名称duration_kind和分布参数duration_params给出，
+    分布参数与RandomGenerator中对应方法的参数相同，例如三角分布为(最小值, 众数, 最大值)。
+    使用分布参数时，模拟引擎会成批抽取持续时间，避免每次调用Python函数。
+    
     属性:
         id (str): 活动的唯一标识符
         name (str): 活动名称
@@ -21,25 +34,41 @@ class Activity:
         generated_resources (list): 生成资源类型列表
         successor_activities (list): 后继活动ID列表
         priority (int): 活动优先级，用于解决同时到达的流实体的处理顺序
+        duration_params (tuple): 持续时间的分布参数，未指定时为None
+        duration_kind (str): 持续时间的分布名称，可以是'uniform', 'normal', 'triangular', 'exponential', 'beta'
+    
+    活动加入模型时会在模型的ID注册表中登记，整数ID保存在_iid中，未登记时为-1。
+    Model.freeze将后继活动ID解析为活动对象，保存在_resolved_successors中，未解析时为空元组。
     """
     
-    def __init__(self, id, name, duration_function, required_resources=None, 
+    __slots__ = ('id', 'name', 'duration_function', 'required_resources', 'released_resources',
+                 'generated_resources', 'successor_activities', 'priority', 'duration_kind',
+                 'duration_params', '_iid', '_resolved_successors')
+    
+    def __init__(self, id, name, duration_function=None, required_resources=None, 
                  released_resources=None, generated_resources=None, 
-                 successor_activities=None, priority=0):
+                 successor_activities=None, priority=0, duration_params=None, duration_kind='triangular'):
         """
         初始化活动
         
         参数:
             id (str): 活动的唯一标识符
             name (str): 活动名称
-            duration_function (callable): 返回活动持续时间的函数
+            duration_function (callable, optional): 返回活动持续时间的函数，默认为None
             required_resources (list, optional): 所需资源类型列表，默认为None
             released_resources (list, optional): 释放资源类型列表，默认为None
             generated_resources (list, optional): 生成资源类型列表，默认为None
             successor_activities (list, optional): 后继活动ID列表，默认为None
             priority (int, optional): 活动优先级，默认为0
+            duration_params (tuple, optional): 持续时间的分布参数，默认为None
+            duration_kind (str, optional): 持续时间的分布名称，默认为'triangular'
         """
-        self.id = id
+        if duration_function is None and duration_params is None:
+            raise ValueError(f"Activity {id} needs either duration_function or duration_params")
+        if duration_kind not in BufferedRNG.DISTRIBUTIONS:
+            raise ValueError(f"Unknown duration_kind for activity {id}: {duration_kind}")
+        
+        self.id = sys.intern(id) if type(id) is str else id
         self.name = name
         self.duration_function = duration_function
         self.required_resources = required_resources or []
@@ -47,17 +76,27 @@ class Activity:
         self.generated_resources = generated_resources or []
         self.successor_activities = successor_activities or []
         self.priority = priority
+        self.duration_kind = duration_kind
+        self.duration_params = tuple(duration_params) if duration_params is not None else None
+        if duration_kind == 'beta' and self.duration_params is not None and len(self.duration_params) == 2:
+            # Beta分布默认取值范围为[0, 1]
+            self.duration_params += (0, 1)
+        self._iid = -1
+        self._resolved_successors = ()
     
     def get_duration(self):
         """
         获取活动持续时间
         
-        调用持续时间函数获取活动持续时间。
+        调用持续时间函数获取活动持续时间；
+        如果没有持续时间函数，则按分布名称和分布参数抽取。
         
         返回:
             float: 活动持续时间
         """
-        return self.duration_function()
+        if self.duration_function is not None:
+            return self.duration_function()
+        return getattr(RandomGenerator, self.duration_kind)(*self.duration_params)
     
     def __str__(self):
         """返回活动的字符串表示"""
@@ -75,6 +114,7 @@ class Model:
         activities (dict): 活动字典，键为活动ID，值为活动对象
         initial_flow_entities (list): 初始流实体列表
         initial_resources (list): 初始资源列表
+        id_registry (IdRegistry): 活动、流实体和资源的ID注册表
     """
     
     def __init__(self, name):
@@ -88,6 +128,25 @@ class Model:
         self.activities = {}
         self.initial_flow_entities = []
         self.initial_resources = []
+        self.id_registry = IdRegistry()
+        
+        # 模型版本号，每次通过add_activity或add_flow_entity修改模型时加1；
+        # 验证结果为(版本号, 是否有效)
+        self._version = 0
+        self._validation = None
+    
+    def register(self, obj):
+        """
+        在ID注册表中登记活动、流实体或资源，并将整数ID保存到其_iid属性
+        
+        参数:
+            obj (Activity or FlowEntity or ResourceEntity): 要登记的对象
+        
+        返回:
+            int: 整数ID
+        """
+        obj._iid = self.id_registry.to_int(obj.id)
+        return obj._iid
     
     def add_activity(self, activity):
         """
@@ -102,6 +161,8 @@ class Model:
         if activity.id in self.activities:
             return False
         self.activities[activity.id] = activity
+        self.register(activity)
+        self._version += 1
         return True
     
     def add_flow_entity(self, entity):
@@ -112,6 +173,8 @@ class Model:
             entity (FlowEntity): 要添加的流实体
         """
         self.initial_flow_entities.append(entity)
+        self.register(entity)
+        self._version += 1
     
     def add_resource(self, resource):
         """
@@ -121,6 +184,7 @@ class Model:
             resource (ResourceEntity): 要添加的资源
         """
         self.initial_resources.append(resource)
+        self.register(resource)
     
     def get_activity(self, activity_id):
         """
@@ -142,21 +206,53 @@ class Model:
         1. 所有活动的后继活动都存在
         2. 所有流实体的初始活动都存在
         
+        验证结果会被缓存，直到通过add_activity或add_flow_entity修改模型为止；
+        直接修改活动的successor_activities等属性不会使缓存失效，freeze总是重新验证。
+        
         返回:
             bool: 如果模型有效则为True，否则为False
         """
-        # 检查所有活动的后继活动都存在
-        for activity_id, activity in self.activities.items():
-            for successor_id in activity.successor_activities:
-                if successor_id not in self.activities:
-                    return False
+        if self._validation is not None and self._validation[0] == self._version:
+            return self._validation[1]
+        return self._revalidate()
+    
+    def _revalidate(self):
+        """
+        不使用缓存验证模型，并更新缓存的验证结果
         
-        # 检查所有流实体的初始活动都存在
-        for entity in self.initial_flow_entities:
-            if entity.activity_id not in self.activities:
-                return False
+        返回:
+            bool: 如果模型有效则为True，否则为False
+        """
+        # 收集所有被引用的活动ID，与已有活动ID做一次集合差
+        referenced = {successor_id for activity in self.activities.values()
+                      for successor_id in activity.successor_activities}
+        referenced.update(entity.activity_id for entity in self.initial_flow_entities)
+        valid = not (referenced - self.activities.keys())
         
-        return True
+        self._validation = (self._version, valid)
+        return valid
+    
+    def freeze(self):
+        """
+        冻结模型
+        
+        不使用缓存重新验证模型，并将每个活动的后继活动ID解析为活动对象，保存到活动的_resolved_successors中，
+        模拟引擎创建后继流实体时直接使用，不再按ID查找活动。
+        
+        返回:
+            Model: 模型本身
+        
+        异常:
+            ValueError: 模型无效时抛出
+        """
+        if not self._revalidate():
+            raise ValueError(f"Model {self.name} references unknown activities")
+        
+        activities = self.activities
+        for activity in activities.values():
+            activity._resolved_successors = tuple(activities[successor_id]
+                                                  for successor_id in activity.successor_activities)
+        return self
     
     def __str__(self):
         """返回模型的字符串表示"""
@@ -2,15 +2,20 @@
 SDESA Python库 - 安装和配置文件
 """
 
+from pathlib import Path
+
 from setuptools import setup, find_packages
 
+readme = Path(__file__).with_name("README.md")
+long_description = readme.read_text(encoding="utf-8") if readme.exists() else ""
+
 setup(
     name="sdesa",
     version="0.1.0",
     author="SDESA开发团队",
     author_email="sdesa@example.com",
     description="基于SDESA的离散事件模拟Python库",
-    long_description=open("README.md", encoding="utf-8").read(),
+    long_description=long_description,
     long_description_content_type="text/markdown",
     url="https://github.com/sdesa/sdesa-python",
     packages=find_packages(),
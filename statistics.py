@@ -2,11 +2,120 @@
 SDESA Python库 - 统计模块
 
 该模块包含SDESA的统计功能，用于收集和分析模拟结果。
+
+活动ID和资源ID在创建统计对象时用sys.intern驻留；
+按动态拼接的ID查找统计数据时，先对ID调用sys.intern可以加快字典查找。
 """
 
+import csv
+import json
+import sys
+from collections.abc import Mapping
+
 import numpy as np
-import pandas as pd
-from collections import defaultdict
+
+
+class _ArrayBuffer:
+    """
+    容量按倍数增长的float64数组
+    
+    values返回已写入部分的视图，不复制数据。
+    """
+    
+    __slots__ = ('_data', '_n')
+    
+    def __init__(self, values=None, columns=None):
+        """
+        初始化数组
+        
+        参数:
+            values (array_like, optional): 初始数据，默认为None
+            columns (int, optional): 列数，默认为None，表示一维数组
+        """
+        shape = (-1,) if columns is None else (-1, columns)
+        data = np.array(values if values is not None else (), dtype=np.float64).reshape(shape)
+        self._n = len(data)
+        if self._n < 16:
+            grown = np.empty((16,) + data.shape[1:])
+            grown[:self._n] = data
+            data = grown
+        self._data = data
+    
+    @property
+    def values(self):
+        """已写入部分的视图"""
+        return self._data[:self._n]
+    
+    def append(self, value):
+        """
+        追加一个元素（一维）或一行（二维），容量不足时扩大一倍
+        
+        参数:
+            value (float or sequence): 元素或行
+        """
+        n = self._n
+        if n == len(self._data):
+            grown = np.empty((2 * n,) + self._data.shape[1:])
+            grown[:n] = self._data
+            self._data = grown
+        self._data[n] = value
+        self._n = n + 1
+    
+    def __len__(self):
+        """返回已写入的元素或行数"""
+        return self._n
+
+
+def _sorted_percentiles(sorted_values, percentiles):
+    """
+    由已排序数组按线性插值计算百分位数，结果与np.percentile的默认方法相同
+    
+    参数:
+        sorted_values (numpy.ndarray): 已排序的非空一维数组
+        percentiles (list): 百分位数列表
+    
+    返回:
+        list: 各百分位数对应的值
+    
+    异常:
+        ValueError: 百分位数不在[0, 100]范围内时
+    """
+    q = np.asarray(percentiles, dtype=np.float64)
+    if not np.all((q >= 0) & (q <= 100)):
+        raise ValueError("Percentiles must be in the range [0, 100]")
+    index = q / 100 * (len(sorted_values) - 1)
+    lower = np.floor(index).astype(np.intp)
+    upper = np.minimum(lower + 1, len(sorted_values) - 1)
+    weight = index - lower
+    a = sorted_values[lower]
+    b = sorted_values[upper]
+    # 与numpy相同：权重不小于0.5时从上端插值，保证端点精确
+    return np.where(weight >= 0.5, b - (b - a) * (1 - weight), a + (b - a) * weight).tolist()
+
+
+def resource_arrays(resource_statistics):
+    """
+    将资源统计字典转换为按列存放的数组
+    
+    所有资源的忙碌时间段拼接为一个数组，按所属资源用一次bincount求和，
+    不再对每个资源分别求和。
+    
+    参数:
+        resource_statistics (dict): 资源统计字典，键为资源ID，值为ResourceStatistics对象
+    
+    返回:
+        tuple: (资源ID数组, 忙碌时间总长度数组, 最后一个忙碌时间段的结束时间数组)，顺序与字典相同；
+            没有忙碌时间段的资源，忙碌时间总长度和结束时间均为0
+    """
+    ids = np.fromiter(resource_statistics, dtype=object, count=len(resource_statistics))
+    periods = [stats.busy_periods for stats in resource_statistics.values()]
+    counts = np.fromiter(map(len, periods), dtype=np.intp, count=len(periods))
+    periods = np.concatenate(periods) if periods else np.empty((0, 2))
+    owners = np.repeat(np.arange(len(counts)), counts)
+    busy = np.bincount(owners, weights=periods[:, 1] - periods[:, 0], minlength=len(counts)).astype(np.float64, copy=False)
+    ends = np.zeros(len(counts))
+    np.maximum.at(ends, owners, periods[:, 1])
+    return ids, busy, ends
 
 
 class ActivityStatistics:
@@ -15,13 +124,20 @@ class ActivityStatistics:
     
     用于收集和分析活动的统计数据，包括完成次数、等待时间和服务时间。
     
+    各项计算结果在第一次计算后缓存，直到通过add_waiting_time、add_service_time
+    或重新赋值修改等待时间或服务时间为止。
+    排序后的数组同样缓存，之后任意百分位数的查询只需按下标插值。
+    等待时间和服务时间保存在容量按倍数增长的数组中，属性返回已写入部分的视图。
+    
     属性:
         activity_id (str): 活动ID
         completion_count (int): 完成次数
-        waiting_times (list): 等待时间列表
-        service_times (list): 服务时间列表
+        waiting_times (numpy.ndarray): 等待时间数组
+        service_times (numpy.ndarray): 服务时间数组
     """
     
+    __slots__ = ('activity_id', 'completion_count', '_waiting_times', '_service_times', '_cache')
+    
     def __init__(self, activity_id, completion_count=0, waiting_times=None, service_times=None):
         """
         初始化活动统计
@@ -29,13 +145,61 @@ class ActivityStatistics:
         参数:
             activity_id (str): 活动ID
             completion_count (int, optional): 完成次数，默认为0
-            waiting_times (list, optional): 等待时间列表，默认为None
-            service_times (list, optional): 服务时间列表，默认为None
+            waiting_times (array_like, optional): 等待时间列表或数组，默认为None
+            service_times (array_like, optional): 服务时间列表或数组，默认为None
         """
-        self.activity_id = activity_id
+        self._cache = {}
+        self.activity_id = sys.intern(activity_id) if type(activity_id) is str else activity_id
         self.completion_count = completion_count
-        self.waiting_times = waiting_times or []
-        self.service_times = service_times or []
+        self.waiting_times = waiting_times
+        self.service_times = service_times
+    
+    @property
+    def waiting_times(self):
+        """等待时间数组"""
+        return self._waiting_times.values
+    
+    @waiting_times.setter
+    def waiting_times(self, values):
+        self._waiting_times = _ArrayBuffer(values)
+        self._cache.clear()
+    
+    @property
+    def service_times(self):
+        """服务时间数组"""
+        return self._service_times.values
+    
+    @service_times.setter
+    def service_times(self, values):
+        self._service_times = _ArrayBuffer(values)
+        self._cache.clear()
+    
+    def add_waiting_time(self, waiting_time):
+        """
+        添加一个等待时间
+        
+        参数:
+            waiting_time (float): 等待时间
+        """
+        self._waiting_times.append(waiting_time)
+        self._cache.clear()
+    
+    def add_service_time(self, service_time):
+        """
+        添加一个服务时间
+        
+        参数:
+            service_time (float): 服务时间
+        """
+        self._service_times.append(service_time)
+        self._cache.clear()
+    
+    def _cached(self, key, compute):
+        """返回缓存的计算结果，没有缓存时调用compute计算并缓存"""
+        cache = self._cache
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
     
     def calculate_average_waiting_time(self):
         """
@@ -44,9 +208,9 @@ class ActivityStatistics:
         返回:
             float: 平均等待时间
         """
-        if not self.waiting_times:
+        if len(self.waiting_times) == 0:
             return 0.0
-        return np.mean(self.waiting_times)
+        return self._cached('average_waiting_time', lambda: np.mean(self.waiting_times))
     
     def calculate_average_service_time(self):
         """
@@ -55,9 +219,9 @@ class ActivityStatistics:
         返回:
             float: 平均服务时间
         """
-        if not self.service_times:
+        if len(self.service_times) == 0:
             return 0.0
-        return np.mean(self.service_times)
+        return self._cached('average_service_time', lambda: np.mean(self.service_times))
     
     def calculate_total_time(self):
         """
@@ -78,9 +242,10 @@ class ActivityStatistics:
         返回:
             dict: 百分位数字典，键为百分位数，值为对应的等待时间
         """
-        if not self.waiting_times:
+        if len(self.waiting_times) == 0:
             return {p: 0.0 for p in percentiles}
-        return {p: np.percentile(self.waiting_times, p) for p in percentiles}
+        values = self._cached('sorted_waiting_times', lambda: np.sort(self.waiting_times))
+        return dict(zip(percentiles, _sorted_percentiles(values, percentiles)))
     
     def calculate_service_time_percentiles(self, percentiles=[25, 50, 75, 90, 95]):
         """
@@ -92,9 +257,10 @@ class ActivityStatistics:
         返回:
             dict: 百分位数字典，键为百分位数，值为对应的服务时间
         """
-        if not self.service_times:
+        if len(self.service_times) == 0:
             return {p: 0.0 for p in percentiles}
-        return {p: np.percentile(self.service_times, p) for p in percentiles}
+        values = self._cached('sorted_service_times', lambda: np.sort(self.service_times))
+        return dict(zip(percentiles, _sorted_percentiles(values, percentiles)))
     
     def to_dict(self):
         """
@@ -103,12 +269,14 @@ class ActivityStatistics:
         返回:
             dict: 活动统计字典
         """
+        average_waiting_time = self.calculate_average_waiting_time()
+        average_service_time = self.calculate_average_service_time()
         return {
             'activity_id': self.activity_id,
             'completion_count': self.completion_count,
-            'average_waiting_time': self.calculate_average_waiting_time(),
-            'average_service_time': self.calculate_average_service_time(),
-            'total_time': self.calculate_total_time(),
+            'average_waiting_time': average_waiting_time,
+            'average_service_time': average_service_time,
+            'total_time': average_waiting_time + average_service_time,
             'waiting_time_percentiles': self.calculate_waiting_time_percentiles(),
             'service_time_percentiles': self.calculate_service_time_percentiles()
         }
@@ -124,24 +292,90 @@ class ResourceStatistics:
     
     用于收集和分析资源的统计数据，包括忙碌时间段和空闲时间段。
     
+    各项计算结果在第一次计算后缓存，直到通过add_busy_period、add_idle_period
+    或重新赋值修改忙碌时间段或空闲时间段为止。
+    时间段保存在容量按倍数增长的两列数组中，属性返回已写入部分的视图；
+    忙碌时间段长度只计算一次，由利用率、平均值和百分位数共用；
+    百分位数由缓存的排序结果按下标插值得到。
+    
     属性:
         resource_id (str): 资源ID
-        busy_periods (list): 忙碌时间段列表，每个时间段为(开始时间, 结束时间)
-        idle_periods (list): 空闲时间段列表，每个时间段为(开始时间, 结束时间)
+        busy_periods (numpy.ndarray): 忙碌时间段数组，形状为(n, 2)，每行为(开始时间, 结束时间)
+        idle_periods (numpy.ndarray): 空闲时间段数组，形状为(n, 2)，每行为(开始时间, 结束时间)
     """
     
+    __slots__ = ('resource_id', '_busy_periods', '_idle_periods', '_cache')
+    
     def __init__(self, resource_id, busy_periods=None, idle_periods=None):
         """
         初始化资源统计
         
         参数:
             resource_id (str): 资源ID
-            busy_periods (list, optional): 忙碌时间段列表，默认为None
-            idle_periods (list, optional): 空闲时间段列表，默认为None
+            busy_periods (array_like, optional): 忙碌时间段列表或数组，默认为None
+            idle_periods (array_like, optional): 空闲时间段列表或数组，默认为None
+        """
+        self._cache = {}
+        self.resource_id = sys.intern(resource_id) if type(resource_id) is str else resource_id
+        self.busy_periods = busy_periods
+        self.idle_periods = idle_periods
+    
+    @property
+    def busy_periods(self):
+        """忙碌时间段数组"""
+        return self._busy_periods.values
+    
+    @busy_periods.setter
+    def busy_periods(self, periods):
+        self._busy_periods = _ArrayBuffer(periods, columns=2)
+        self._cache.clear()
+    
+    @property
+    def idle_periods(self):
+        """空闲时间段数组"""
+        return self._idle_periods.values
+    
+    @idle_periods.setter
+    def idle_periods(self, periods):
+        self._idle_periods = _ArrayBuffer(periods, columns=2)
+        self._cache.clear()
+    
+    def add_busy_period(self, start, end):
+        """
+        添加一个忙碌时间段
+        
+        参数:
+            start (float): 开始时间
+            end (float): 结束时间
+        """
+        self._busy_periods.append((start, end))
+        self._cache.clear()
+    
+    def add_idle_period(self, start, end):
         """
-        self.resource_id = resource_id
-        self.busy_periods = busy_periods or []
-        self.idle_periods = idle_periods or []
+        添加一个空闲时间段
+        
+        参数:
+            start (float): 开始时间
+            end (float): 结束时间
+        """
+        self._idle_periods.append((start, end))
+        self._cache.clear()
+    
+    def _cached(self, key, compute):
+        """返回缓存的计算结果，没有缓存时调用compute计算并缓存"""
+        cache = self._cache
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+    
+    def _busy_spans(self):
+        """忙碌时间段长度数组，计算一次后由各项统计共用"""
+        return self._cached('busy_spans', lambda: self.busy_periods[:, 1] - self.busy_periods[:, 0])
+    
+    def _total_busy_time(self):
+        """忙碌时间总长度"""
+        return self._cached('total_busy_time', lambda: float(self._busy_spans().sum()))
     
     def calculate_utilization_rate(self, total_time=None):
         """
@@ -153,16 +387,16 @@ class ResourceStatistics:
         返回:
             float: 利用率（0-1之间的值）
         """
-        if not self.busy_periods:
+        if len(self.busy_periods) == 0:
             return 0.0
-        
-        total_busy_time = sum(end - start for start, end in self.busy_periods)
-        
+        # 按总时间分别缓存，同一次模拟的多个图表共用
+        return self._cached(('utilization_rate', total_time), lambda: self._utilization_rate(total_time))
+    
+    def _utilization_rate(self, total_time):
+        """计算利用率，total_time为None时使用最后一个忙碌时间段的结束时间"""
         if total_time is None:
-            # 如果没有提供总时间，使用最后一个忙碌时间段的结束时间
-            total_time = max(end for _, end in self.busy_periods)
-        
-        return total_busy_time / total_time if total_time > 0 else 0.0
+            total_time = self.busy_periods[:, 1].max()
+        return self._total_busy_time() / total_time if total_time > 0 else 0.0
     
     def calculate_average_busy_period(self):
         """
@@ -171,9 +405,9 @@ class ResourceStatistics:
         返回:
             float: 平均忙碌时间段长度
         """
-        if not self.busy_periods:
+        if len(self.busy_periods) == 0:
             return 0.0
-        return np.mean([end - start for start, end in self.busy_periods])
+        return self._cached('average_busy_period', lambda: self._busy_spans().mean())
     
     def calculate_average_idle_period(self):
         """
@@ -182,9 +416,9 @@ class ResourceStatistics:
         返回:
             float: 平均空闲时间段长度
         """
-        if not self.idle_periods:
+        if len(self.idle_periods) == 0:
             return 0.0
-        return np.mean([end - start for start, end in self.idle_periods])
+        return self._cached('average_idle_period', lambda: np.mean(self.idle_periods[:, 1] - self.idle_periods[:, 0]))
     
     def calculate_busy_time_percentiles(self, percentiles=[25, 50, 75, 90, 95]):
         """
@@ -196,10 +430,10 @@ class ResourceStatistics:
         返回:
             dict: 百分位数字典，键为百分位数，值为对应的忙碌时间段长度
         """
-        if not self.busy_periods:
+        if len(self.busy_periods) == 0:
             return {p: 0.0 for p in percentiles}
-        busy_times = [end - start for start, end in self.busy_periods]
-        return {p: np.percentile(busy_times, p) for p in percentiles}
+        values = self._cached('sorted_busy_spans', lambda: np.sort(self._busy_spans()))
+        return dict(zip(percentiles, _sorted_percentiles(values, percentiles)))
     
     def to_dict(self, total_time=None):
         """
@@ -245,30 +479,25 @@ class SimulationStatistics:
             resource_statistics (dict, optional): 资源统计字典，默认为None
             total_simulation_time (float, optional): 总模拟时间，默认为0
         """
-        self.activity_statistics = {}
-        if activity_statistics:
-            for activity_id, stats in activity_statistics.items():
-                if isinstance(stats, dict):
-                    self.activity_statistics[activity_id] = ActivityStatistics(
-                        activity_id=activity_id,
-                        completion_count=stats.get('completion_count', 0),
-                        waiting_times=stats.get('waiting_times', []),
-                        service_times=stats.get('service_times', [])
-                    )
-                else:
-                    self.activity_statistics[activity_id] = stats
-        
-        self.resource_statistics = {}
-        if resource_statistics:
-            for resource_id, stats in resource_statistics.items():
-                if isinstance(stats, dict):
-                    self.resource_statistics[resource_id] = ResourceStatistics(
-                        resource_id=resource_id,
-                        busy_periods=stats.get('busy_periods', []),
-                        idle_periods=stats.get('idle_periods', [])
-                    )
-                else:
-                    self.resource_statistics[resource_id] = stats
+        # 字典形式的统计数据（如to_dict的结果）转换为统计对象，其他值原样保留
+        self.activity_statistics = {
+            activity_id: ActivityStatistics(
+                activity_id,
+                stats.get('completion_count', 0),
+                stats.get('waiting_times'),
+                stats.get('service_times')
+            ) if type(stats) is dict else stats
+            for activity_id, stats in (activity_statistics or {}).items()
+        }
+        
+        self.resource_statistics = {
+            resource_id: ResourceStatistics(
+                resource_id,
+                stats.get('busy_periods'),
+                stats.get('idle_periods')
+            ) if type(stats) is dict else stats
+            for resource_id, stats in (resource_statistics or {}).items()
+        }
         
         self.total_simulation_time = total_simulation_time
     
@@ -303,12 +532,31 @@ class SimulationStatistics:
         返回:
             float: 总体资源利用率（0-1之间的值）
         """
-        if not self.resource_statistics:
+        if not self.resource_statistics or self.total_simulation_time <= 0:
             return 0.0
         
-        utilization_rates = [stats.calculate_utilization_rate(self.total_simulation_time) 
-                            for stats in self.resource_statistics.values()]
-        return np.mean(utilization_rates)
+        return float((self._busy_totals() / self.total_simulation_time).mean())
+    
+    def _busy_totals(self):
+        """
+        各资源忙碌时间总长度数组，顺序与resource_statistics相同
+        
+        返回:
+            numpy.ndarray: 忙碌时间总长度数组
+        """
+        return resource_arrays(self.resource_statistics)[1]
+    
+    def to_arrays(self):
+        """
+        按列返回资源的忙碌时间
+        
+        资源利用率即busy / total，可以一次向量化计算。
+        
+        返回:
+            tuple: (资源ID数组, 忙碌时间总长度数组, 总模拟时间)，顺序与resource_statistics相同
+        """
+        ids, busy, _ = resource_arrays(self.resource_statistics)
+        return ids, busy, self.total_simulation_time
     
     def calculate_bottleneck_activities(self):
         """
@@ -335,31 +583,38 @@ class SimulationStatistics:
         if not self.resource_statistics:
             return []
         
-        resources = [(resource_id, stats.calculate_utilization_rate(self.total_simulation_time)) 
-                    for resource_id, stats in self.resource_statistics.items()]
+        if self.total_simulation_time > 0:
+            rates = (self._busy_totals() / self.total_simulation_time).tolist()
+        else:
+            rates = [0.0] * len(self.resource_statistics)
+        resources = list(zip(self.resource_statistics, rates))
         resources.sort(key=lambda x: x[1], reverse=True)
         return resources
     
-    def to_dict(self):
+    def to_dict(self, lazy=False):
         """
         转换为字典
         
+        默认立即计算全部项并返回普通字典；
+        lazy为True时返回只读的惰性映射，各项在第一次访问时才计算，适合只需要其中几项的场合。
+        
+        参数:
+            lazy (bool, optional): 是否返回惰性映射，默认为False
+        
         返回:
-            dict: 模拟统计字典
+            dict or Mapping: 模拟统计字典，lazy为True时为只读的惰性映射
         """
-        return {
-            'activity_statistics': {activity_id: stats.to_dict() for activity_id, stats in self.activity_statistics.items()},
-            'resource_statistics': {resource_id: stats.to_dict(self.total_simulation_time) for resource_id, stats in self.resource_statistics.items()},
-            'total_simulation_time': self.total_simulation_time,
-            'overall_resource_utilization': self.calculate_overall_resource_utilization(),
-            'bottleneck_activities': self.calculate_bottleneck_activities(),
-            'critical_resources': self.calculate_critical_resources()
-        }
+        view = _StatisticsView(self)
+        if lazy:
+            return view
+        return view.materialize()
     
     def export_to_csv(self, filename_prefix):
         """
         导出统计数据到CSV
         
+        逐行写入各活动和各资源的统计数据，不构造中间表格。
+        
         参数:
             filename_prefix (str): 文件名前缀
         
@@ -369,47 +624,30 @@ class SimulationStatistics:
         files = []
         
         # 导出活动统计
-        activity_data = []
-        for activity_id, stats in self.activity_statistics.items():
-            activity_data.append({
-                'activity_id': activity_id,
-                'completion_count': stats.completion_count,
-                'average_waiting_time': stats.calculate_average_waiting_time(),
-                'average_service_time': stats.calculate_average_service_time(),
-                'total_time': stats.calculate_total_time()
-            })
-        
-        if activity_data:
-            activity_df = pd.DataFrame(activity_data)
+        if self.activity_statistics:
             activity_file = f"{filename_prefix}_activity_statistics.csv"
-            activity_df.to_csv(activity_file, index=False)
+            _write_csv(activity_file,
+                       ['activity_id', 'completion_count', 'average_waiting_time', 'average_service_time', 'total_time'],
+                       ((activity_id, stats.completion_count, stats.calculate_average_waiting_time(),
+                         stats.calculate_average_service_time(), stats.calculate_total_time())
+                        for activity_id, stats in self.activity_statistics.items()))
             files.append(activity_file)
         
         # 导出资源统计
-        resource_data = []
-        for resource_id, stats in self.resource_statistics.items():
-            resource_data.append({
-                'resource_id': resource_id,
-                'utilization_rate': stats.calculate_utilization_rate(self.total_simulation_time),
-                'average_busy_period': stats.calculate_average_busy_period(),
-                'average_idle_period': stats.calculate_average_idle_period()
-            })
-        
-        if resource_data:
-            resource_df = pd.DataFrame(resource_data)
+        if self.resource_statistics:
             resource_file = f"{filename_prefix}_resource_statistics.csv"
-            resource_df.to_csv(resource_file, index=False)
+            _write_csv(resource_file,
+                       ['resource_id', 'utilization_rate', 'average_busy_period', 'average_idle_period'],
+                       ((resource_id, stats.calculate_utilization_rate(self.total_simulation_time),
+                         stats.calculate_average_busy_period(), stats.calculate_average_idle_period())
+                        for resource_id, stats in self.resource_statistics.items()))
             files.append(resource_file)
         
         # 导出总体统计
-        summary_data = {
-            'total_simulation_time': [self.total_simulation_time],
-            'overall_resource_utilization': [self.calculate_overall_resource_utilization()]
-        }
-        
-        summary_df = pd.DataFrame(summary_data)
         summary_file = f"{filename_prefix}_summary_statistics.csv"
-        summary_df.to_csv(summary_file, index=False)
+        _write_csv(summary_file,
+                   ['total_simulation_time', 'overall_resource_utilization'],
+                   [(self.total_simulation_time, self.calculate_overall_resource_utilization())])
         files.append(summary_file)
         
         return files
@@ -418,19 +656,152 @@ class SimulationStatistics:
         """
         导出统计数据到JSON
         
+        逐个写入各活动和各资源的统计字典，不在内存中构造完整的统计字典，
+        输出内容与json.dump(self.to_dict(), f, indent=4)相同。
+        
         参数:
             filename (str): 文件名
         
         返回:
             str: 导出的文件名
         """
-        import json
-        
         with open(filename, 'w') as f:
-            json.dump(self.to_dict(), f, indent=4)
+            f.write('{\n    "activity_statistics": ')
+            _write_json_mapping(f, ((activity_id, stats.to_dict())
+                                    for activity_id, stats in self.activity_statistics.items()))
+            f.write(',\n    "resource_statistics": ')
+            _write_json_mapping(f, ((resource_id, stats.to_dict(self.total_simulation_time))
+                                    for resource_id, stats in self.resource_statistics.items()))
+            for key, value in (('total_simulation_time', self.total_simulation_time),
+                               ('overall_resource_utilization', self.calculate_overall_resource_utilization()),
+                               ('bottleneck_activities', self.calculate_bottleneck_activities()),
+                               ('critical_resources', self.calculate_critical_resources())):
+                f.write(f',\n    {json.dumps(key)}: {_indent_json(value, 1)}')
+            f.write('\n}')
         
         return filename
     
     def __str__(self):
         """返回模拟统计的字符串表示"""
         return f"SimulationStatistics(activities={len(self.activity_statistics)}, resources={len(self.resource_statistics)}, total_time={self.total_simulation_time:.2f})"
+
+
+class _StatisticsView(Mapping):
+    """
+    SimulationStatistics.to_dict(lazy=True)返回的惰性映射
+    
+    各项在第一次访问时由对应的_compute_<键>方法计算并缓存。
+    键到计算方法的对应表COMPUTE在定义类时生成一次，访问时不再拼接方法名查找。
+    """
+    
+    KEYS = ('activity_statistics', 'resource_statistics', 'total_simulation_time',
+            'overall_resource_utilization', 'bottleneck_activities', 'critical_resources')
+    
+    def __init__(self, statistics):
+        """
+        初始化惰性映射
+        
+        参数:
+            statistics (SimulationStatistics): 模拟统计
+        """
+        self._statistics = statistics
+        self._values = {}
+    
+    def __getitem__(self, key):
+        """返回键对应的值，第一次访问时计算"""
+        values = self._values
+        if key not in values:
+            compute = self.COMPUTE.get(key)
+            if compute is None:
+                raise KeyError(key)
+            values[key] = compute(self)
+        return values[key]
+    
+    def materialize(self):
+        """
+        计算全部项并返回普通字典
+        
+        返回:
+            dict: 模拟统计字典
+        """
+        values = self._values
+        for key, compute in self.COMPUTE.items():
+            if key not in values:
+                values[key] = compute(self)
+        return {key: values[key] for key in self.KEYS}
+    
+    def __iter__(self):
+        """按固定顺序迭代键"""
+        return iter(self.KEYS)
+    
+    def __len__(self):
+        """返回键的数量"""
+        return len(self.KEYS)
+    
+    def _compute_activity_statistics(self):
+        return {activity_id: stats.to_dict() for activity_id, stats in self._statistics.activity_statistics.items()}
+    
+    def _compute_resource_statistics(self):
+        statistics = self._statistics
+        return {resource_id: stats.to_dict(statistics.total_simulation_time)
+                for resource_id, stats in statistics.resource_statistics.items()}
+    
+    def _compute_total_simulation_time(self):
+        return self._statistics.total_simulation_time
+    
+    def _compute_overall_resource_utilization(self):
+        return self._statistics.calculate_overall_resource_utilization()
+    
+    def _compute_bottleneck_activities(self):
+        return self._statistics.calculate_bottleneck_activities()
+    
+    def _compute_critical_resources(self):
+        return self._statistics.calculate_critical_resources()
+
+
+_StatisticsView.COMPUTE = {key: getattr(_StatisticsView, f'_compute_{key}') for key in _StatisticsView.KEYS}
+
+
+def _write_csv(filename, header, rows):
+    """
+    逐行写入CSV文件
+    
+    参数:
+        filename (str): 文件名
+        header (list): 列名列表
+        rows (iterable): 行的可迭代对象
+    """
+    with open(filename, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _indent_json(value, level):
+    """
+    将值编码为缩进为4的JSON文本，用于嵌套在第level层
+    
+    参数:
+        value: 要编码的值
+        level (int): 嵌套层数
+    
+    返回:
+        str: JSON文本
+    """
+    return json.dumps(value, indent=4).replace('\n', '\n' + '    ' * level)
+
+
+def _write_json_mapping(f, items):
+    """
+    将(键, 值)逐个写成第1层的JSON对象
+    
+    参数:
+        f (file): 文件对象
+        items (iterable): (键, 值)的可迭代对象
+    """
+    empty = True
+    for key, value in items:
+        f.write('{\n        ' if empty else ',\n        ')
+        f.write(f'{json.dumps(key)}: {_indent_json(value, 2)}')
+        empty = False
+    f.write('{}' if empty else '\n    }')
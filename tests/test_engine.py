@@ -0,0 +1,69 @@
+"""
+SDESA Python库 - 模拟引擎测试
+"""
+
+import sys
+
+from sdesa.core import FlowEntity
+from sdesa.engine import SimulationEngine
+from sdesa.model import Activity, Model
+
+
+def constant(value):
+    """返回固定持续时间的函数"""
+    return lambda: value
+
+
+def test_successor_does_not_overtake_waiting_entity():
+    """后继活动的流实体不能抢在先到的等待流实体之前取得新生成的资源"""
+    model = Model(name="fifo")
+    model.add_activity(Activity(id="make", name="Make", duration_function=constant(1.0),
+                                generated_resources=["part"], successor_activities=["use"]))
+    model.add_activity(Activity(id="use", name="Use", duration_function=constant(1.0),
+                                required_resources=["part"]))
+    model.add_flow_entity(FlowEntity(id="x", activity_id="use", arrival_time=0))
+    model.add_flow_entity(FlowEntity(id="y", activity_id="make", arrival_time=0))
+
+    engine = SimulationEngine(model)
+    statistics = engine.run(duration=10)
+
+    begins = [(event.time, event.entity_id) for event in engine.event_log
+              if event.activity_id == "use" and event.type == "begin_service"]
+    assert begins == [(1.0, "x")]
+    assert statistics['activity_statistics']['use']['waiting_times'].tolist() == [1.0]
+
+
+def test_generated_resource_wakes_every_waiter():
+    """被唤醒的流实体转而等待其他资源时，新生成的资源仍由其他等待的流实体使用"""
+    model = Model(name="wakeup")
+    model.add_activity(Activity(id="make", name="Make", duration_function=constant(1.0),
+                                generated_resources=["part"]))
+    model.add_activity(Activity(id="fit", name="Fit", duration_function=constant(1.0),
+                                required_resources=["part", "tool"]))
+    model.add_activity(Activity(id="use", name="Use", duration_function=constant(1.0),
+                                required_resources=["part"]))
+    model.add_flow_entity(FlowEntity(id="p", activity_id="fit", arrival_time=0))
+    model.add_flow_entity(FlowEntity(id="q", activity_id="use", arrival_time=0))
+    model.add_flow_entity(FlowEntity(id="g", activity_id="make", arrival_time=0))
+
+    engine = SimulationEngine(model)
+    statistics = engine.run(duration=10)
+
+    assert statistics['activity_statistics']['use']['completion_count'] == 1
+    assert statistics['activity_statistics']['fit']['completion_count'] == 0
+    assert engine.resource_entity_queue.get_resource("part") is None
+
+
+def test_long_zero_duration_chain_does_not_recurse():
+    """持续时间为0的活动组成的长链不会超过递归深度限制"""
+    length = 3 * sys.getrecursionlimit()
+    model = Model(name="chain")
+    for i in range(length):
+        successors = [f"a{i + 1}"] if i + 1 < length else []
+        model.add_activity(Activity(id=f"a{i}", name=f"A{i}", duration_function=constant(0.0),
+                                    successor_activities=successors))
+    model.add_flow_entity(FlowEntity(id="e", activity_id="a0", arrival_time=0))
+
+    statistics = SimulationEngine(model).run(duration=10)
+
+    assert all(stats['completion_count'] == 1 for stats in statistics['activity_statistics'].values())
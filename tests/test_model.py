@@ -0,0 +1,21 @@
+"""
+SDESA Python库 - 模型模块测试
+"""
+
+import pytest
+
+from sdesa.model import Activity, Model
+
+
+def test_freeze_revalidates_after_direct_edit():
+    """验证之后直接修改后继活动，freeze仍抛出ValueError而不是KeyError"""
+    model = Model(name="edited")
+    activity = Activity(id="load", name="Load", duration_params=(1, 2, 3), successor_activities=["haul"])
+    model.add_activity(activity)
+    model.add_activity(Activity(id="haul", name="Haul", duration_params=(1, 2, 3)))
+    assert model.validate()
+
+    activity.successor_activities.append("nope")
+    with pytest.raises(ValueError):
+        model.freeze()
+    assert not model.validate()
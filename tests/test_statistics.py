@@ -0,0 +1,52 @@
+"""
+SDESA Python库 - 统计模块测试
+"""
+
+import json
+from collections.abc import Mapping
+
+import numpy as np
+import pytest
+
+from sdesa.statistics import ActivityStatistics, SimulationStatistics
+
+
+def make_statistics():
+    """创建包含一个活动和一个资源的模拟统计"""
+    return SimulationStatistics(
+        activity_statistics={'load': {'completion_count': 2, 'waiting_times': [0.0, 1.0],
+                                      'service_times': [2.0, 3.0]}},
+        resource_statistics={'loader_1': {'busy_periods': [[0.0, 2.0], [3.0, 6.0]]}},
+        total_simulation_time=10.0
+    )
+
+
+def test_to_dict_returns_plain_dict():
+    """to_dict默认返回可以直接序列化为JSON的普通字典"""
+    result = make_statistics().to_dict()
+    assert type(result) is dict
+    assert json.loads(json.dumps(result))['total_simulation_time'] == 10.0
+
+
+def test_to_dict_lazy_matches_eager():
+    """惰性映射的内容与普通字典相同"""
+    statistics = make_statistics()
+    view = statistics.to_dict(lazy=True)
+    assert isinstance(view, Mapping) and not isinstance(view, dict)
+    assert dict(view) == statistics.to_dict()
+
+
+@pytest.mark.parametrize("percentile", [-10, 100.5, float('nan')])
+def test_percentiles_out_of_range_rejected(percentile):
+    """与np.percentile一样，不在[0, 100]范围内的百分位数抛出ValueError"""
+    statistics = ActivityStatistics(activity_id='load', waiting_times=[0.0, 1.0, 2.0])
+    with pytest.raises(ValueError):
+        statistics.calculate_waiting_time_percentiles([50, percentile])
+
+
+def test_percentiles_match_numpy():
+    """百分位数与np.percentile的默认方法相同，包括两个端点"""
+    values = [3.0, 1.0, 4.0, 1.5, 9.0]
+    statistics = ActivityStatistics(activity_id='load', service_times=values)
+    result = statistics.calculate_service_time_percentiles([0, 25, 50, 90, 100])
+    assert list(result.values()) == np.percentile(values, [0, 25, 50, 90, 100]).tolist()
@@ -0,0 +1,91 @@
+"""
+SDESA Python库 - 工具模块测试
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from sdesa import utils
+from sdesa.utils import DataImporter
+
+
+def write_csv(tmp_path, text):
+    """将文本写入临时CSV文件并返回文件路径"""
+    path = tmp_path / "data.csv"
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+def test_csv_integers_beyond_int64(tmp_path):
+    """超出int64范围的整数不抛出OverflowError"""
+    data = DataImporter.import_from_csv(write_csv(tmp_path, "a,b,c\n1,18446744073709551615,99999999999999999999\n"),
+                                        backend='csv')
+    assert data['a'].dtype == np.int64
+    assert data['b'].dtype == np.uint64
+    assert data['c'].tolist() == [99999999999999999999]
+
+
+def test_csv_short_rows_padded_with_nan(tmp_path):
+    """字段少于列名的行在末尾补缺失值，不丢弃列"""
+    data = DataImporter.import_from_csv(write_csv(tmp_path, "a,b,c\n1,2\n3,4\n"), backend='csv')
+    assert data.dtype.names == ('a', 'b', 'c')
+    assert data['b'].tolist() == [2, 4]
+    assert all(math.isnan(value) for value in data['c'])
+
+
+def test_csv_long_rows_rejected(tmp_path):
+    """字段多于列名的行抛出ValueError"""
+    with pytest.raises(ValueError):
+        DataImporter.import_from_csv(write_csv(tmp_path, "a,b\n1,2\n3,4,5\n"), backend='csv')
+
+
+def test_csv_duplicate_headers_renamed(tmp_path):
+    """重复的列名按pandas的规则添加后缀"""
+    data = DataImporter.import_from_csv(write_csv(tmp_path, "a,a,a.1\n1,2,3\n"), backend='csv')
+    assert data.dtype.names == ('a', 'a.2', 'a.1')
+    assert data[0].tolist() == (1, 2, 3)
+
+
+def test_csv_bool_columns(tmp_path):
+    """True/False列转换为布尔数组"""
+    data = DataImporter.import_from_csv(write_csv(tmp_path, "a,b\nTrue,1\nfalse,2\n"), backend='csv')
+    assert data['a'].dtype == bool
+    assert data['a'].tolist() == [True, False]
+
+
+def test_csv_empty_file_raises(tmp_path):
+    """空文件抛出ValueError"""
+    with pytest.raises(ValueError):
+        DataImporter.import_from_csv(write_csv(tmp_path, ""), backend='csv')
+
+
+def test_default_backend_returns_dataframe(tmp_path):
+    """默认读取方式总是返回pandas.DataFrame，与文件大小无关"""
+    pd = pytest.importorskip("pandas")
+    filename = write_csv(tmp_path, "id,n\nload,1\nhaul,2\n")
+    result = DataImporter.import_from_csv(filename)
+    assert isinstance(result, pd.DataFrame)
+    pd.testing.assert_frame_equal(result, pd.read_csv(filename))
+
+
+def test_csv_underscore_numbers_kept_as_strings(tmp_path):
+    """与pandas一样，带下划线的数字保留为字符串"""
+    data = DataImporter.import_from_csv(write_csv(tmp_path, "a,b\n1_000,1_0.5\n2,3\n"), backend='csv')
+    assert data['a'].tolist() == ['1_000', '2']
+    assert data['b'].tolist() == ['1_0.5', '3']
+
+
+def test_csv_reads_utf8_regardless_of_locale(tmp_path, monkeypatch):
+    """显式按UTF-8读取，不依赖系统区域设置的默认编码"""
+    path = tmp_path / "data.csv"
+    path.write_text("活动,时长\n装载,2.5\n", encoding='utf-8')
+
+    def latin1_open(file, mode='r', *args, encoding=None, **kwargs):
+        return open(file, mode, *args, encoding=encoding or 'latin-1', **kwargs)
+
+    monkeypatch.setattr(utils, 'open', latin1_open, raising=False)
+    data = DataImporter.import_from_csv(str(path), backend='csv')
+    assert data.dtype.names == ('活动', '时长')
+    assert data['活动'].tolist() == ['装载']
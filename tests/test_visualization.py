@@ -0,0 +1,52 @@
+"""
+SDESA Python库 - 可视化模块测试
+"""
+
+import os
+
+os.environ.setdefault('SDESA_HEADLESS', '1')
+
+from sdesa.statistics import SimulationStatistics
+from sdesa.visualization import DashboardGenerator
+
+
+def make_statistics(total_time=10.0):
+    """创建包含一个活动和一个资源的模拟统计"""
+    return SimulationStatistics(
+        activity_statistics={'load': {'completion_count': 2, 'waiting_times': [0.0, 1.0],
+                                      'service_times': [2.0, 3.0]}},
+        resource_statistics={'loader_1': {'busy_periods': [[0.0, 2.0], [3.0, 6.0]]}},
+        total_simulation_time=total_time
+    )
+
+
+def test_dashboard_returns_independent_figures():
+    """统计数据不变时返回新的图形，调用者的修改不影响之后的调用"""
+    generator = DashboardGenerator()
+    first = generator.create_dashboard(make_statistics())
+    first.update_layout(title_text="changed")
+    first.data[0].y = [0.0]
+
+    second = generator.create_dashboard(make_statistics())
+    assert second is not first
+    assert second.layout.title.text == "SDESA Simulation Dashboard"
+    assert list(second.data[0].y) == [0.5]
+
+
+def test_dashboard_rebuilds_when_statistics_change():
+    """统计数据变化时重新计算"""
+    generator = DashboardGenerator()
+    generator.create_dashboard(make_statistics())
+    figure = generator.create_dashboard(make_statistics(total_time=20.0))
+    assert list(figure.data[0].y) == [0.25]
+
+
+def test_dashboard_save_reflects_later_edits(tmp_path):
+    """保存之后再修改图形，再次保存的文件包含修改"""
+    generator = DashboardGenerator()
+    generator.create_dashboard(make_statistics())
+    generator.save(str(tmp_path / "a.html"))
+    generator.fig.update_layout(title_text="CHANGED")
+    generator.save(str(tmp_path / "b.html"))
+    assert "CHANGED" not in (tmp_path / "a.html").read_text(encoding='utf-8')
+    assert "CHANGED" in (tmp_path / "b.html").read_text(encoding='utf-8')
@@ -6,7 +6,9 @@ SDESA Python库 - 工具模块
 
 import numpy as np
 import random
-import math
+import csv
+import time
+from datetime import datetime
 
 
 class RandomGenerator:
@@ -14,6 +16,9 @@ class RandomGenerator:
     随机数生成器类
     
     提供各种概率分布的随机数生成功能。
+    
+    单个随机数由全局的BufferedRNG成批生成后依次取出；
+    batch_*方法一次返回指定数量随机数的NumPy数组。
     """
     
     @staticmethod
@@ -28,7 +33,7 @@ class RandomGenerator:
         返回:
             float: 均匀分布随机数
         """
-        return random.uniform(min_val, max_val)
+        return _default_rng.uniform(min_val, max_val)
     
     @staticmethod
     def normal(mean, std):
@@ -42,7 +47,7 @@ class RandomGenerator:
         返回:
             float: 正态分布随机数
         """
-        return random.normalvariate(mean, std)
+        return _default_rng.normal(mean, std)
     
     @staticmethod
     def triangular(min_val, mode, max_val):
@@ -57,7 +62,7 @@ class RandomGenerator:
         返回:
             float: 三角分布随机数
         """
-        return random.triangular(min_val, mode, max_val)
+        return _default_rng.triangular(min_val, mode, max_val)
     
     @staticmethod
     def exponential(lambd):
@@ -70,7 +75,7 @@ class RandomGenerator:
         返回:
             float: 指数分布随机数
         """
-        return random.expovariate(lambd)
+        return _default_rng.exponential(lambd)
     
     @staticmethod
     def beta(alpha, beta, min_val=0, max_val=1):
@@ -86,11 +91,84 @@ class RandomGenerator:
         返回:
             float: Beta分布随机数
         """
-        # 生成[0,1]范围内的Beta分布随机数
-        value = random.betavariate(alpha, beta)
+        return _default_rng.beta(alpha, beta, min_val, max_val)
+    
+    @staticmethod
+    def batch_uniform(min_val, max_val, size):
+        """
+        成批生成均匀分布随机数
+        
+        参数:
+            min_val (float): 最小值
+            max_val (float): 最大值
+            size (int): 随机数个数
+        
+        返回:
+            numpy.ndarray: 均匀分布随机数数组
+        """
+        return _draw_batch(np.random, 'uniform', (min_val, max_val), size)
+    
+    @staticmethod
+    def batch_normal(mean, std, size):
+        """
+        成批生成正态分布随机数
+        
+        参数:
+            mean (float): 均值
+            std (float): 标准差
+            size (int): 随机数个数
+        
+        返回:
+            numpy.ndarray: 正态分布随机数数组
+        """
+        return _draw_batch(np.random, 'normal', (mean, std), size)
+    
+    @staticmethod
+    def batch_triangular(min_val, mode, max_val, size):
+        """
+        成批生成三角分布随机数
+        
+        参数:
+            min_val (float): 最小值
+            mode (float): 众数
+            max_val (float): 最大值
+            size (int): 随机数个数
         
-        # 缩放到[min_val, max_val]范围
-        return min_val + (max_val - min_val) * value
+        返回:
+            numpy.ndarray: 三角分布随机数数组
+        """
+        return _draw_batch(np.random, 'triangular', (min_val, mode, max_val), size)
+    
+    @staticmethod
+    def batch_exponential(lambd, size):
+        """
+        成批生成指数分布随机数
+        
+        参数:
+            lambd (float): 速率参数
+            size (int): 随机数个数
+        
+        返回:
+            numpy.ndarray: 指数分布随机数数组
+        """
+        return _draw_batch(np.random, 'exponential', (lambd,), size)
+    
+    @staticmethod
+    def batch_beta(alpha, beta, min_val=0, max_val=1, size=1):
+        """
+        成批生成Beta分布随机数
+        
+        参数:
+            alpha (float): Alpha参数
+            beta (float): Beta参数
+            min_val (float, optional): 最小值，默认为0
+            max_val (float, optional): 最大值，默认为1
+            size (int, optional): 随机数个数，默认为1
+        
+        返回:
+            numpy.ndarray: Beta分布随机数数组
+        """
+        return _draw_batch(np.random, 'beta', (alpha, beta, min_val, max_val), size)
     
     @staticmethod
     def set_seed(seed):
@@ -102,6 +180,170 @@ class RandomGenerator:
         """
         random.seed(seed)
         np.random.seed(seed)
+        _default_rng.seed(seed)
+
+
+def _draw_batch(rng, distribution, params, size):
+    """
+    成批生成指定分布的随机数
+    
+    参数与RandomGenerator中对应方法的参数相同。
+    
+    参数:
+        rng (numpy.random.Generator or module): 随机数生成器，也可以是numpy.random模块
+        distribution (str): 分布名称，可以是'uniform', 'normal', 'triangular', 'exponential', 'beta'
+        params (tuple): 分布参数
+        size (int): 随机数个数
+    
+    返回:
+        numpy.ndarray: 随机数数组
+    """
+    if distribution == 'uniform':
+        min_val, max_val = params
+        return rng.uniform(min_val, max_val, size)
+    if distribution == 'normal':
+        mean, std = params
+        return rng.normal(mean, std, size)
+    if distribution == 'triangular':
+        min_val, mode, max_val = params
+        if min_val == max_val:
+            return np.full(size, float(min_val))
+        return rng.triangular(min_val, mode, max_val, size)
+    if distribution == 'exponential':
+        lambd, = params
+        return rng.exponential(1.0 / lambd, size)
+    if distribution == 'beta':
+        alpha, beta, min_val, max_val = params
+        return min_val + (max_val - min_val) * rng.beta(alpha, beta, size)
+    raise ValueError(f"Unknown distribution: {distribution}")
+
+
+class BufferedRNG:
+    """
+    缓冲随机数生成器类
+    
+    基于numpy.random.Generator成批生成随机数并依次取出，
+    把每次调用的开销分摊到一整批随机数上。
+    
+    draw按(分布, 参数)分别缓冲：第一次出现的参数只抽取一个随机数，
+    同一组参数再次出现时才建立缓冲，批量从INITIAL_SIZE开始，每次补充后加倍，最大为size。
+    最多同时记录MAX_BUFFERS组只出现过一次的参数和MAX_BUFFERS组参数的缓冲，
+    超出时丢弃最早的一组，因此每次调用参数都不同时既不会成批抽取，也不会挤掉已有的缓冲。
+    sampler返回固定参数、每次补充size个随机数的无参数函数，可直接用作活动的持续时间函数。
+    
+    属性:
+        size (int): 每批随机数的最大个数
+    """
+    
+    INITIAL_SIZE = 64
+    MAX_BUFFERS = 256
+    
+    # 支持的分布名称
+    DISTRIBUTIONS = ('uniform', 'normal', 'triangular', 'exponential', 'beta')
+    
+    def __init__(self, seed=None, size=8192):
+        """
+        初始化缓冲随机数生成器
+        
+        参数:
+            seed (int, optional): 随机数种子，默认为None
+            size (int, optional): 每批随机数的最大个数，默认为8192
+        """
+        self.size = size
+        self.seed(seed)
+    
+    def seed(self, seed):
+        """
+        重新设置随机数种子并清空所有缓冲
+        
+        参数:
+            seed (int): 随机数种子
+        """
+        self._rng = np.random.default_rng(seed)
+        self._buffers = {}
+        self._seen_once = {}
+    
+    def draw(self, distribution, *params):
+        """
+        取出一个指定分布的随机数
+        
+        参数:
+            distribution (str): 分布名称，可以是'uniform', 'normal', 'triangular', 'exponential', 'beta'
+            *params: 分布参数
+        
+        返回:
+            float: 随机数
+        """
+        key = (distribution, params)
+        entry = self._buffers.get(key)
+        if entry is None:
+            # 第一次出现的参数只抽取一个随机数
+            seen_once = self._seen_once
+            if key not in seen_once:
+                if len(seen_once) >= self.MAX_BUFFERS:
+                    del seen_once[next(iter(seen_once))]
+                seen_once[key] = None
+                return float(_draw_batch(self._rng, distribution, params, 1)[0])
+            del seen_once[key]
+            if len(self._buffers) >= self.MAX_BUFFERS:
+                del self._buffers[next(iter(self._buffers))]
+            # 缓冲为[随机数数组, 下一个可用位置, 下一批的个数]
+            entry = self._buffers[key] = [np.empty(0), 0, self.INITIAL_SIZE]
+        values, index, batch = entry
+        if index == len(values):
+            values = entry[0] = _draw_batch(self._rng, distribution, params, batch)
+            entry[2] = min(2 * batch, self.size)
+            index = 0
+        entry[1] = index + 1
+        return float(values[index])
+    
+    def sampler(self, distribution, *params):
+        """
+        创建指定分布和参数的随机数函数
+        
+        参数:
+            distribution (str): 分布名称
+            *params: 分布参数
+        
+        返回:
+            callable: 每次调用返回一个随机数的无参数函数
+        """
+        values = np.empty(0)
+        index = 0
+        
+        def sample():
+            nonlocal values, index
+            if index == len(values):
+                values = _draw_batch(self._rng, distribution, params, self.size)
+                index = 0
+            index += 1
+            return float(values[index - 1])
+        
+        return sample
+    
+    def uniform(self, min_val, max_val):
+        """生成均匀分布随机数"""
+        return self.draw('uniform', min_val, max_val)
+    
+    def normal(self, mean, std):
+        """生成正态分布随机数"""
+        return self.draw('normal', mean, std)
+    
+    def triangular(self, min_val, mode, max_val):
+        """生成三角分布随机数"""
+        return self.draw('triangular', min_val, mode, max_val)
+    
+    def exponential(self, lambd):
+        """生成指数分布随机数"""
+        return self.draw('exponential', lambd)
+    
+    def beta(self, alpha, beta, min_val=0, max_val=1):
+        """生成Beta分布随机数，并缩放到[min_val, max_val]范围"""
+        return self.draw('beta', alpha, beta, min_val, max_val)
+
+
+# RandomGenerator单个随机数所用的全局缓冲随机数生成器
+_default_rng = BufferedRNG()
 
 
 class Logger:
@@ -110,64 +352,106 @@ class Logger:
     
     提供日志记录功能。
     
+    时间戳字符串按秒缓存，同一秒内的消息不再重复格式化。
+    输出到文件时，日志文件在第一次写入时打开并保持打开，直到调用close()为止；
+    文件按行缓冲，每条消息写入后立即刷新，程序异常退出时不会丢失已记录的消息。
+    日志记录器可以用作上下文管理器，退出with语句时自动调用close()。
+    
+    日志级别为整数常量，级别过滤只需一次整数比较；
+    为了兼容，也可以使用级别名称'DEBUG', 'INFO', 'WARNING', 'ERROR'指定级别。
+    
     属性:
-        level (str): 日志级别，可以是'DEBUG', 'INFO', 'WARNING', 'ERROR'
+        level (int): 日志级别，可以是DEBUG, INFO, WARNING, ERROR
         log_file (str): 日志文件路径，如果为None则输出到控制台
     """
     
-    DEBUG = 'DEBUG'
-    INFO = 'INFO'
-    WARNING = 'WARNING'
-    ERROR = 'ERROR'
+    DEBUG = 0
+    INFO = 1
+    WARNING = 2
+    ERROR = 3
+    
+    LEVEL_NAMES = ('DEBUG', 'INFO', 'WARNING', 'ERROR')
+    level_order = {name: value for value, name in enumerate(LEVEL_NAMES)}
     
     def __init__(self, level=INFO, log_file=None):
         """
         初始化日志记录器
         
         参数:
-            level (str, optional): 日志级别，默认为INFO
+            level (int or str, optional): 日志级别或级别名称，默认为INFO
             log_file (str, optional): 日志文件路径，默认为None
         """
         self.level = level
         self.log_file = log_file
-        self.level_order = {
-            self.DEBUG: 0,
-            self.INFO: 1,
-            self.WARNING: 2,
-            self.ERROR: 3
-        }
+        self._file = None
+        self._timestamp_second = None
+        self._timestamp = ''
+    
+    @property
+    def level(self):
+        """日志级别"""
+        return self._threshold
+    
+    @level.setter
+    def level(self, level):
+        self._threshold = self._to_level(level)
+    
+    @classmethod
+    def _to_level(cls, level):
+        """将级别名称转换为整数级别，未知名称按DEBUG处理，整数级别原样返回"""
+        if isinstance(level, str):
+            return cls.level_order.get(level, cls.DEBUG)
+        return level
     
     def _should_log(self, message_level):
         """
         检查是否应该记录日志
         
         参数:
-            message_level (str): 消息级别
+            message_level (int or str): 消息级别
         
         返回:
             bool: 如果应该记录则为True，否则为False
         """
-        return self.level_order.get(message_level, 0) >= self.level_order.get(self.level, 0)
+        return self._to_level(message_level) >= self._threshold
     
     def _write_log(self, message_level, message):
         """
         写入日志
         
         参数:
-            message_level (str): 消息级别
+            message_level (int): 消息级别
             message (str): 消息内容
         """
-        import datetime
-        
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        log_message = f"[{timestamp}] [{message_level}] {message}"
+        second = int(time.time())
+        if second != self._timestamp_second:
+            self._timestamp = datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S')
+            self._timestamp_second = second
+        log_message = f"[{self._timestamp}] [{self.LEVEL_NAMES[message_level]}] {message}"
         
         if self.log_file:
-            with open(self.log_file, 'a') as f:
-                f.write(log_message + '\n')
+            if self._file is None:
+                self._file = open(self.log_file, 'a', buffering=1)
+            self._file.write(log_message + '\n')
         else:
             print(log_message)
     
+    def close(self):
+        """
+        关闭日志文件，未打开日志文件时不做任何操作
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        """进入with语句，返回日志记录器本身"""
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        """退出with语句时关闭日志文件"""
+        self.close()
+    
     def debug(self, message):
         """
         记录调试信息
@@ -175,7 +459,7 @@ class Logger:
         参数:
             message (str): 消息内容
         """
-        if self._should_log(self.DEBUG):
+        if self.DEBUG >= self._threshold:
             self._write_log(self.DEBUG, message)
     
     def info(self, message):
@@ -185,7 +469,7 @@ class Logger:
         参数:
             message (str): 消息内容
         """
-        if self._should_log(self.INFO):
+        if self.INFO >= self._threshold:
             self._write_log(self.INFO, message)
     
     def warning(self, message):
@@ -195,7 +479,7 @@ class Logger:
         参数:
             message (str): 消息内容
         """
-        if self._should_log(self.WARNING):
+        if self.WARNING >= self._threshold:
             self._write_log(self.WARNING, message)
     
     def error(self, message):
@@ -205,7 +489,7 @@ class Logger:
         参数:
             message (str): 消息内容
         """
-        if self._should_log(self.ERROR):
+        if self.ERROR >= self._threshold:
             self._write_log(self.ERROR, message)
 
 
@@ -217,18 +501,33 @@ class DataImporter:
     """
     
     @staticmethod
-    def import_from_csv(filename):
+    def import_from_csv(filename, backend='pandas'):
         """
         从CSV导入数据
         
+        backend为'csv'时使用标准库csv模块按UTF-8编码读取，返回NumPy结构化数组，列名和各列类型按pandas.read_csv的默认规则推断：
+        各列依次尝试转换为整数、布尔值、浮点数（缺失值为nan），含下划线的数字和其他值保留为字符串，
+        重复的列名改为'a.1'、'a.2'等，字段少于列名的行在末尾补缺失值；
+        backend为'pandas'（默认）时返回pandas.DataFrame。
+        只有使用pandas时才导入pandas。
+        
         参数:
             filename (str): CSV文件路径
+            backend (str, optional): 读取方式，可以是'pandas', 'csv'，默认为'pandas'
         
         返回:
-            pandas.DataFrame: 导入的数据
-        """
-        import pandas as pd
-        return pd.read_csv(filename)
+            numpy.ndarray or pandas.DataFrame: 导入的数据
+        
+        异常:
+            ValueError: backend未知，或backend为'csv'时文件为空或某行字段多于列名
+        """
+        if backend == 'pandas':
+            import pandas as pd
+            return pd.read_csv(filename)
+        if backend != 'csv':
+            raise ValueError(f"Unknown CSV backend: {backend}")
+        
+        return _read_csv_array(filename)
     
     @staticmethod
     def import_from_json(filename):
@@ -261,5 +560,119 @@ class DataImporter:
         return pd.read_excel(filename, sheet_name=sheet_name)
 
 
+# pandas.read_csv默认识别为缺失值的字符串
+_CSV_NA_VALUES = frozenset(('', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND',
+                            '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'))
+
+# pandas.read_csv默认识别为布尔值的字符串
+_CSV_TRUE_VALUES = frozenset(('True', 'TRUE', 'true'))
+_CSV_FALSE_VALUES = frozenset(('False', 'FALSE', 'false'))
+
+
+def _read_csv_array(filename):
+    """
+    使用标准库csv模块将CSV文件读取为NumPy结构化数组
+    
+    列名和各列的类型与pandas.read_csv的默认结果一致：重复的列名改为'a.1'、'a.2'等，
+    字段少于列名的行在末尾补缺失值。
+    只有列名的文件各列为空的浮点数数组，字符串列中的缺失值保留为原字符串。
+    
+    参数:
+        filename (str): CSV文件路径
+    
+    返回:
+        numpy.ndarray: 导入的数据
+    
+    异常:
+        ValueError: 文件为空或某行字段多于列名时
+    """
+    with open(filename, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = list(reader)
+    
+    if not header:
+        raise ValueError("No columns to parse from file")
+    
+    width = len(header)
+    for line, row in enumerate(rows, start=2):
+        if len(row) > width:
+            raise ValueError(f"Expected {width} fields in line {line}, saw {len(row)}")
+        if len(row) < width:
+            row.extend([''] * (width - len(row)))
+    
+    if rows:
+        columns = [_csv_column(values) for values in zip(*rows)]
+    else:
+        columns = [np.empty(0) for _ in header]
+    
+    names = _dedup_csv_names(header)
+    data = np.empty(len(rows), dtype=[(name, column.dtype) for name, column in zip(names, columns)])
+    for name, column in zip(names, columns):
+        data[name] = column
+    return data
+
+
+def _dedup_csv_names(header):
+    """
+    按pandas.read_csv的规则为重复的列名添加'.1'、'.2'等后缀，并跳过已有的列名
+    
+    参数:
+        header (list): 列名列表
+    
+    返回:
+        list: 不重复的列名列表
+    """
+    existing = set(header)
+    counts = {}
+    names = []
+    for name in header:
+        count = counts.get(name, 0)
+        if count:
+            while f"{name}.{count}" in existing:
+                count += 1
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            existing.add(name)
+        else:
+            counts[name] = 1
+        names.append(name)
+    return names
+
+
+def _csv_column(values):
+    """
+    将CSV的一列字符串转换为数组
+    
+    依次尝试整数（超出int64时为uint64，再超出时为Python整数的object数组）、
+    布尔值、浮点数（缺失值为nan），否则保留为字符串。
+    与pandas一样不接受'1_000'这类带下划线的数字，含下划线的列保留为字符串。
+    
+    参数:
+        values (tuple): 一列的字符串
+    
+    返回:
+        numpy.ndarray: 转换后的数组
+    """
+    if any('_' in value for value in values):
+        return np.array(values, dtype=str)
+    try:
+        return np.array(values, dtype=np.int64)
+    except OverflowError:
+        try:
+            return np.array(values, dtype=np.uint64)
+        except (OverflowError, ValueError):
+            return np.array([int(value) for value in values], dtype=object)
+    except ValueError:
+        pass
+    if values and all(value in _CSV_TRUE_VALUES or value in _CSV_FALSE_VALUES for value in values):
+        return np.array([value in _CSV_TRUE_VALUES for value in values], dtype=bool)
+    try:
+        return np.array(['nan' if value in _CSV_NA_VALUES else value for value in values], dtype=np.float64)
+    except ValueError:
+        pass
+    return np.array(values, dtype=str)
+
+
 # 创建全局随机数生成器实例
 random_generator = RandomGenerator()
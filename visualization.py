@@ -2,18 +2,126 @@
 SDESA Python库 - 可视化模块
 
 该模块包含SDESA的可视化功能，用于可视化模拟过程和结果。
+
+设置环境变量SDESA_HEADLESS（非空且不为'0'）后，Matplotlib使用Agg后端，
+各图表直接创建Figure和FigureCanvasAgg，不经过pyplot的图形管理，
+适用于只保存图片的脚本和持续集成环境。
 """
 
+import hashlib
+import os
+
+import matplotlib
+
+HEADLESS = os.environ.get('SDESA_HEADLESS', '') not in ('', '0')
+if HEADLESS:
+    matplotlib.use('Agg', force=False)
+
 import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import numpy as np
-import pandas as pd
-from matplotlib.colors import LinearSegmentedColormap
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection, PolyCollection
+from matplotlib.figure import Figure
 import networkx as nx
 import plotly.graph_objects as go
-import plotly.express as px
+import plotly.io as pio
 from plotly.subplots import make_subplots
 
+from .core import EventLog
+from .statistics import resource_arrays
+
+
+def _new_figure(figsize, dpi):
+    """
+    创建图形和坐标轴
+    
+    无界面模式下直接创建Figure并绑定FigureCanvasAgg，图形不登记到pyplot；
+    否则使用plt.subplots。
+    
+    参数:
+        figsize (tuple): 图形大小
+        dpi (int): 图形分辨率
+    
+    返回:
+        tuple: (matplotlib.figure.Figure, matplotlib.axes.Axes)
+    """
+    if not HEADLESS:
+        return plt.subplots(figsize=figsize, dpi=dpi)
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot(111)
+
+
+def _prepare_figure(chart, reuse):
+    """
+    为图表准备图形和坐标轴
+    
+    reuse为True且图表已有图形时清空原有坐标轴重新使用，否则创建新的图形。
+    
+    参数:
+        chart: 具有figsize、dpi、fig和ax属性的图表对象
+        reuse (bool): 是否重用已有的图形
+    """
+    if reuse and chart.fig is not None:
+        chart.ax.clear()
+    else:
+        chart.fig, chart.ax = _new_figure(chart.figsize, chart.dpi)
+
+
+def _statistics_digest(simulation_statistics):
+    """
+    计算模拟统计原始数据的摘要，用于判断仪表板的输入数据是否变化
+    
+    摘要覆盖总模拟时间、各资源的忙碌时间段以及各活动的完成次数、等待时间和服务时间，
+    不需要先计算任何统计量。
+    
+    参数:
+        simulation_statistics (SimulationStatistics): 模拟统计对象
+    
+    返回:
+        bytes: 摘要
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr(simulation_statistics.total_simulation_time).encode())
+    for resource_id, stats in simulation_statistics.resource_statistics.items():
+        h.update(f"\x00r{resource_id}\x00{len(stats.busy_periods)}".encode())
+        h.update(np.ascontiguousarray(stats.busy_periods, dtype=np.float64).tobytes())
+    for activity_id, stats in simulation_statistics.activity_statistics.items():
+        h.update(f"\x00a{activity_id}\x00{stats.completion_count}\x00{len(stats.waiting_times)}".encode())
+        h.update(np.ascontiguousarray(stats.waiting_times, dtype=np.float64).tobytes())
+        h.update(f"\x00{len(stats.service_times)}".encode())
+        h.update(np.ascontiguousarray(stats.service_times, dtype=np.float64).tobytes())
+    return h.digest()
+
+
+def _pair_events(event_log):
+    """
+    将服务开始记录与服务结束记录配对
+    
+    以(活动, 流实体)的整数ID组合为键，结束记录按键稳定排序一次，
+    每条开始记录用二分查找匹配最早写入的同键结束记录，没有结束记录的开始记录被丢弃。
+    
+    参数:
+        event_log (EventLog): 事件日志
+    
+    返回:
+        tuple: (开始记录行号数组, 结束记录行号数组)，两个数组一一对应
+    """
+    types = event_log.types
+    entity_iids = event_log.entity_iids.astype(np.int64)
+    keys = event_log.activity_iids.astype(np.int64) * (int(entity_iids.max(initial=0)) + 1) + entity_iids
+    begin_rows = np.flatnonzero(types == EventLog.BEGIN)
+    end_rows = np.flatnonzero(types == EventLog.END)
+    if len(end_rows) == 0:
+        return begin_rows[:0], end_rows
+    
+    end_rows = end_rows[np.argsort(keys[end_rows], kind='stable')]
+    end_keys = keys[end_rows]
+    begin_keys = keys[begin_rows]
+    positions = np.minimum(np.searchsorted(end_keys, begin_keys), len(end_rows) - 1)
+    matched = end_keys[positions] == begin_keys
+    return begin_rows[matched], end_rows[positions[matched]]
+
 
 class GanttChart:
     """
@@ -22,6 +130,9 @@ class GanttChart:
     用于绘制活动甘特图，显示活动的开始时间、持续时间和资源使用情况。
     """
     
+    # 活动条的调色板，按活动在活动字典中的顺序循环取色
+    PALETTE = np.asarray(plt.cm.tab20.colors)
+    
     def __init__(self, figsize=(12, 8), dpi=100):
         """
         初始化甘特图
@@ -35,67 +146,114 @@ class GanttChart:
         self.fig = None
         self.ax = None
     
-    def plot(self, event_log, activities, resources=None, title="SDESA Simulation Gantt Chart"):
+    def plot(self, event_log, activities, resources=None, title="SDESA Simulation Gantt Chart", annotate=False,
+             reuse=False, max_bars=5000):
         """
         绘制甘特图
         
+        服务开始和服务结束记录按(活动, 流实体)一次排序配对，所有活动条作为一个PolyCollection绘制。
+        文字标签默认不绘制；annotate为True时每个活动只在开始时间居中的活动条上标注一次。
+        
+        活动条总数超过max_bars时，每个活动只保留持续时间最长的max_bars // 活动数个活动条（至少一个），
+        被省略的活动条用一个覆盖其最早开始到最晚结束时间的浅色条代替，省略的数量标注在Y轴标签上。
+        
         参数:
-            event_log (list): 事件日志
+            event_log (EventLog or list): 事件日志，也可以是事件对象列表
             activities (dict): 活动字典，键为活动ID，值为活动对象
             resources (dict, optional): 资源字典，键为资源ID，值为资源对象
             title (str, optional): 图表标题，默认为"SDESA Simulation Gantt Chart"
+            annotate (bool, optional): 是否为每个活动标注活动名称和其开始时间居中的活动条的流实体ID，默认为False
+            reuse (bool, optional): 是否清空并重用上一次的图形，默认为False，即创建新的图形
+            max_bars (int, optional): 绘制的活动条数量上限，默认为5000，为None时绘制全部活动条
         
         返回:
             matplotlib.figure.Figure: 图形对象
         """
         # 创建图形
-        self.fig, self.ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
-        
-        # 提取活动开始和结束事件
-        activity_events = {}
-        for event in event_log:
-            if event.activity_id not in activity_events:
-                activity_events[event.activity_id] = {'begin': [], 'end': []}
+        _prepare_figure(self, reuse)
+        
+        if not isinstance(event_log, EventLog):
+            event_log = EventLog.from_events(event_log)
+        to_str = event_log.registry.to_str
+        times = event_log.times
+        entity_iids = event_log.entity_iids
+        activity_iids = event_log.activity_iids
+        
+        # 为每条开始记录匹配同一流实体在同一活动的结束记录
+        begin_rows, end_rows = _pair_events(event_log)
+        
+        # 活动按在事件日志中首次出现的顺序排列，每个活动占一行
+        first_rows = np.unique(activity_iids, return_index=True)[1]
+        activity_order = activity_iids[np.sort(first_rows)]
+        activity_ids = [to_str(int(activity_iid)) for activity_iid in activity_order]
+        row_of = np.zeros(int(activity_order.max(initial=0)) + 1, dtype=np.intp)
+        row_of[activity_order] = np.arange(len(activity_order))
+        
+        # 为每个活动分配调色板中的一个颜色
+        activity_index = {activity_id: i for i, activity_id in enumerate(activities)}
+        row_colors = np.array([activity_index[activity_id] for activity_id in activity_ids], dtype=np.intp) % len(self.PALETTE)
+        
+        y_ticks = list(range(len(activity_ids)))
+        y_labels = [activities[activity_id].name if activity_id in activities else activity_id
+                    for activity_id in activity_ids]
+        tick_labels = list(y_labels)
+        
+        rows = row_of[activity_iids[begin_rows]]
+        begin_times = times[begin_rows]
+        end_times = times[end_rows]
+        durations = end_times - begin_times
+        
+        # 活动条过多时按活动保留持续时间最长的活动条，其余的合并为每个活动一个浅色条
+        if max_bars is not None and len(rows) > max_bars:
+            per_row = max(1, max_bars // len(activity_ids))
+            order = np.lexsort((-durations, rows))
+            row_starts = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(activity_ids)))[:-1]))
+            rank = np.arange(len(order)) - row_starts[rows[order]]
+            kept = np.sort(order[rank < per_row])
+            dropped = order[rank >= per_row]
             
-            if event.type == 'begin_service':
-                activity_events[event.activity_id]['begin'].append(event)
-            elif event.type == 'end_service':
-                activity_events[event.activity_id]['end'].append(event)
-        
-        # 为每个活动分配一个颜色
-        colors = plt.cm.tab20.colors
-        activity_colors = {activity_id: colors[i % len(colors)] for i, activity_id in enumerate(activities.keys())}
-        
-        # 绘制活动条
-        y_pos = 0
-        y_ticks = []
-        y_labels = []
-        
-        for activity_id, events in activity_events.items():
-            activity_name = activities[activity_id].name if activity_id in activities else activity_id
-            y_labels.append(activity_name)
-            y_ticks.append(y_pos)
+            dropped_rows = rows[dropped]
+            dropped_counts = np.bincount(dropped_rows, minlength=len(activity_ids))
+            lows = np.full(len(activity_ids), np.inf)
+            highs = np.full(len(activity_ids), -np.inf)
+            np.minimum.at(lows, dropped_rows, begin_times[dropped])
+            np.maximum.at(highs, dropped_rows, end_times[dropped])
+            summary_rows = np.flatnonzero(dropped_counts)
+            self.ax.barh(summary_rows, highs[summary_rows] - lows[summary_rows], left=lows[summary_rows], height=0.5,
+                         color=self.PALETTE[row_colors[summary_rows]], alpha=0.2, zorder=0)
+            for row in summary_rows:
+                tick_labels[row] = f"{y_labels[row]} (+{dropped_counts[row]} more)"
             
-            # 匹配开始和结束事件
-            for begin_event in events['begin']:
-                for end_event in events['end']:
-                    if begin_event.entity_id == end_event.entity_id:
-                        # 绘制活动条
-                        duration = end_event.time - begin_event.time
-                        self.ax.barh(y_pos, duration, left=begin_event.time, height=0.5, 
-                                     color=activity_colors[activity_id], alpha=0.8)
-                        
-                        # 添加活动标签
-                        self.ax.text(begin_event.time + duration/2, y_pos, f"{activity_name} ({begin_event.entity_id})", 
-                                     ha='center', va='center', color='black', fontsize=8)
-                        
-                        break
-            
-            y_pos += 1
+            rows = rows[kept]
+            begin_rows = begin_rows[kept]
+            begin_times = begin_times[kept]
+            end_times = end_times[kept]
+            durations = durations[kept]
+        
+        # 所有活动的活动条作为一个PolyCollection绘制，每个活动条为一个矩形
+        if len(begin_times):
+            verts = np.empty((len(rows), 4, 2))
+            verts[:, :2, 0] = begin_times[:, None]
+            verts[:, 2:, 0] = end_times[:, None]
+            verts[:, (0, 3), 1] = rows[:, None] - 0.25
+            verts[:, (1, 2), 1] = rows[:, None] + 0.25
+            self.ax.add_collection(PolyCollection(verts, facecolors=self.PALETTE[row_colors[rows]], alpha=0.8))
+            self.ax.autoscale_view()
+        
+        # 添加活动标签，每个活动一个，标注在按开始时间排序的中位活动条上
+        if annotate and len(rows):
+            order = np.lexsort((begin_times, rows))
+            counts = np.bincount(rows, minlength=len(activity_ids))
+            labeled_rows = np.flatnonzero(counts)
+            medians = order[(np.cumsum(counts) - counts + (counts - 1) // 2)[labeled_rows]]
+            for begin_time, duration, row, entity_iid in zip(begin_times[medians], durations[medians], rows[medians],
+                                                             entity_iids[begin_rows[medians]]):
+                self.ax.text(begin_time + duration/2, row, f"{y_labels[row]} ({to_str(int(entity_iid))})", 
+                             ha='center', va='center', color='black', fontsize=8)
         
         # 设置Y轴
         self.ax.set_yticks(y_ticks)
-        self.ax.set_yticklabels(y_labels)
+        self.ax.set_yticklabels(tick_labels)
         
         # 设置X轴
         self.ax.set_xlabel('Time')
@@ -107,7 +265,7 @@ class GanttChart:
         self.ax.grid(True, axis='x', linestyle='--', alpha=0.7)
         
         # 调整布局
-        plt.tight_layout()
+        self.fig.tight_layout()
         
         return self.fig
     
@@ -126,6 +284,17 @@ class GanttChart:
         
         self.fig.savefig(filename)
         return filename
+    
+    def close(self):
+        """
+        关闭图形，释放其占用的内存
+        
+        批量生成甘特图时，可以用reuse=True重复使用同一个对象，最后调用close。
+        """
+        if self.fig is not None:
+            plt.close(self.fig)
+            self.fig = None
+            self.ax = None
 
 
 class ResourceUtilizationChart:
@@ -148,30 +317,27 @@ class ResourceUtilizationChart:
         self.fig = None
         self.ax = None
     
-    def plot(self, resource_statistics, title="Resource Utilization"):
+    def plot(self, resource_statistics, title="Resource Utilization", reuse=False):
         """
         绘制资源利用率图表
         
         参数:
             resource_statistics (dict): 资源统计字典，键为资源ID，值为ResourceStatistics对象
             title (str, optional): 图表标题，默认为"Resource Utilization"
+            reuse (bool, optional): 是否清空并重用上一次的图形，默认为False，即创建新的图形
         
         返回:
             matplotlib.figure.Figure: 图形对象
         """
         # 创建图形
-        self.fig, self.ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        _prepare_figure(self, reuse)
         
-        # 提取资源ID和利用率
-        resource_ids = []
-        utilization_rates = []
-        
-        for resource_id, stats in resource_statistics.items():
-            resource_ids.append(resource_id)
-            utilization_rates.append(stats.calculate_utilization_rate())
+        # 按列提取资源ID和利用率，每个资源的利用率以其最后一个忙碌时间段的结束时间为总时间
+        resource_ids, busy, ends = resource_arrays(resource_statistics)
+        utilization_rates = np.divide(busy, ends, out=np.zeros_like(busy), where=ends > 0)
         
         # 绘制条形图
-        bars = self.ax.bar(resource_ids, utilization_rates, color='skyblue')
+        bars = self.ax.bar(resource_ids.tolist(), utilization_rates, color='skyblue')
         
         # 添加数值标签
         for bar in bars:
@@ -191,7 +357,7 @@ class ResourceUtilizationChart:
         self.ax.grid(True, axis='y', linestyle='--', alpha=0.7)
         
         # 调整布局
-        plt.tight_layout()
+        self.fig.tight_layout()
         
         return self.fig
     
@@ -210,6 +376,17 @@ class ResourceUtilizationChart:
         
         self.fig.savefig(filename)
         return filename
+    
+    def close(self):
+        """
+        关闭图形，释放其占用的内存
+        
+        批量生成资源利用率图表时，可以用reuse=True重复使用同一个对象，最后调用close。
+        """
+        if self.fig is not None:
+            plt.close(self.fig)
+            self.fig = None
+            self.ax = None
 
 
 class ActivityNetworkGraph:
@@ -217,8 +394,14 @@ class ActivityNetworkGraph:
     活动网络图类
     
     用于绘制活动网络图，显示活动之间的关系。
+    
+    所有边绘制为一个LineCollection，所有节点绘制为一次散点图，不为每条边单独创建图形对象。
+    活动数量超过MAX_LABELS时，只为度数最高的MAX_LABELS个活动绘制标签。
     """
     
+    # 绘制标签的最大活动数量
+    MAX_LABELS = 50
+    
     def __init__(self, figsize=(12, 8), dpi=100):
         """
         初始化活动网络图
@@ -232,19 +415,20 @@ class ActivityNetworkGraph:
         self.fig = None
         self.ax = None
     
-    def plot(self, model, title="Activity Network"):
+    def plot(self, model, title="Activity Network", reuse=False):
         """
         绘制活动网络图
         
         参数:
             model (Model): 模型对象
             title (str, optional): 图表标题，默认为"Activity Network"
+            reuse (bool, optional): 是否清空并重用上一次的图形，默认为False，即创建新的图形
         
         返回:
             matplotlib.figure.Figure: 图形对象
         """
         # 创建图形
-        self.fig, self.ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        _prepare_figure(self, reuse)
         
         # 创建有向图
         G = nx.DiGraph()
@@ -261,15 +445,30 @@ class ActivityNetworkGraph:
         # 设置节点位置
         pos = nx.spring_layout(G, seed=42)
         
-        # 绘制节点
-        nx.draw_networkx_nodes(G, pos, node_color='skyblue', node_size=500, alpha=0.8, ax=self.ax)
-        
-        # 绘制边
-        nx.draw_networkx_edges(G, pos, width=1.0, alpha=0.5, ax=self.ax)
+        # 绘制边，所有边合并为一个LineCollection，箭头用一次quiver画在边的中点
+        segments = np.array([(pos[u], pos[v]) for u, v in G.edges], dtype=float).reshape(-1, 2, 2)
+        self.ax.add_collection(LineCollection(segments, linewidths=1.0, alpha=0.5, colors='gray'))
+        delta = segments[:, 1] - segments[:, 0]
+        length = np.hypot(delta[:, 0], delta[:, 1])
+        directed = length > 0
+        if directed.any():
+            mid = segments[directed].mean(axis=1)
+            delta = delta[directed] / length[directed, None]
+            self.ax.quiver(mid[:, 0], mid[:, 1], delta[:, 0], delta[:, 1], angles='xy', pivot='mid',
+                           scale=40, width=0.003, color='gray', alpha=0.5)
         
-        # 绘制标签
-        nx.draw_networkx_labels(G, pos, labels={n: G.nodes[n]['label'] for n in G.nodes()}, 
-                               font_size=10, font_weight='bold', ax=self.ax)
+        # 绘制节点
+        xy = np.array([pos[n] for n in G.nodes], dtype=float).reshape(-1, 2)
+        self.ax.scatter(xy[:, 0], xy[:, 1], s=500, c='skyblue', alpha=0.8, zorder=2)
+        
+        # 绘制标签，活动较多时只标注度数最高的活动
+        labels = nx.get_node_attributes(G, 'label')
+        labeled = labels
+        if len(G) > self.MAX_LABELS:
+            labeled = [n for n, _ in sorted(G.degree, key=lambda item: item[1], reverse=True)[:self.MAX_LABELS]]
+        for n in labeled:
+            x, y = pos[n]
+            self.ax.text(x, y, labels.get(n, n), ha='center', va='center', fontsize=10, fontweight='bold', clip_on=True)
         
         # 设置标题
         self.ax.set_title(title)
@@ -278,7 +477,7 @@ class ActivityNetworkGraph:
         self.ax.axis('off')
         
         # 调整布局
-        plt.tight_layout()
+        self.fig.tight_layout()
         
         return self.fig
     
@@ -297,6 +496,17 @@ class ActivityNetworkGraph:
         
         self.fig.savefig(filename)
         return filename
+    
+    def close(self):
+        """
+        关闭图形，释放其占用的内存
+        
+        批量生成活动网络图时，可以用reuse=True重复使用同一个对象，最后调用close。
+        """
+        if self.fig is not None:
+            plt.close(self.fig)
+            self.fig = None
+            self.ax = None
 
 
 class SimulationAnimator:
@@ -304,6 +514,13 @@ class SimulationAnimator:
     模拟动画类
     
     用于创建模拟过程的动画。
+    
+    update只记录每一帧要显示的事件信息，不绘制图形；save时由FuncAnimation逐帧更新
+    同一个文本对象并以blit方式只重绘变化的部分，帧画面直接交给ffmpeg写入文件，
+    不在内存中保存每一帧的图像。
+    
+    属性:
+        frames (list): 各帧的(时间, 事件类型, 活动ID)列表
     """
     
     def __init__(self, figsize=(12, 8), dpi=100):
@@ -320,40 +537,57 @@ class SimulationAnimator:
         self.ax = None
         self.model = None
         self.frames = []
+        self._title = None
     
-    def initialize(self, model):
+    def initialize(self, model, reuse=False):
         """
         初始化动画
         
+        创建图形以及各帧共用的文本对象。
+        
         参数:
             model (Model): 模型对象
+            reuse (bool, optional): 是否清空并重用上一次的图形，默认为False，即创建新的图形
         """
         self.model = model
-        self.fig, self.ax = plt.subplots(figsize=self.figsize, dpi=self.dpi)
+        _prepare_figure(self, reuse)
+        # 文本放在坐标轴内部，blit时随坐标轴区域一起重绘
+        self._title = self.ax.text(0.5, 0.95, '', transform=self.ax.transAxes,
+                                   ha='center', va='top', animated=True)
         self.frames = []
     
     def update(self, event):
         """
         更新动画
         
+        记录事件作为新的一帧，图形在save时绘制。
+        
         参数:
             event (Event): 事件对象
         """
         if self.fig is None:
             raise ValueError("Please call initialize() before update()")
         
-        # 清除当前轴
-        self.ax.clear()
+        self.frames.append((event.time, event.type, event.activity_id))
+    
+    def _init_frame(self):
+        """清空文本，返回需要重绘的对象"""
+        self._title.set_text('')
+        return [self._title]
+    
+    def _draw_frame(self, frame):
+        """
+        绘制一帧
         
-        # 绘制当前状态
-        # 这里需要根据具体的模型和事件类型来绘制
-        # 这只是一个示例
-        self.ax.set_title(f"Time: {event.time:.2f}, Event: {event.type}, Activity: {event.activity_id}")
+        参数:
+            frame (tuple): (时间, 事件类型, 活动ID)
         
-        # 保存当前帧
-        self.fig.canvas.draw()
-        frame = np.array(self.fig.canvas.renderer.buffer_rgba())
-        self.frames.append(frame)
+        返回:
+            list: 需要重绘的对象
+        """
+        time, event_type, activity_id = frame
+        self._title.set_text(f"Time: {time:.2f}, Event: {event_type}, Activity: {activity_id}")
+        return [self._title]
     
     def save(self, filename, fps=10):
         """
@@ -372,12 +606,24 @@ class SimulationAnimator:
         import matplotlib.animation as animation
         
         # 创建动画
-        ani = animation.ArtistAnimation(self.fig, self.frames, interval=1000/fps, blit=True)
+        ani = animation.FuncAnimation(self.fig, self._draw_frame, frames=self.frames, init_func=self._init_frame,
+                                      blit=True, interval=1000/fps, cache_frame_data=False)
         
         # 保存动画
-        ani.save(filename, writer='ffmpeg', fps=fps)
+        ani.save(filename, writer=animation.FFMpegWriter(fps=fps))
         
         return filename
+    
+    def close(self):
+        """
+        关闭图形，释放其占用的内存
+        
+        批量生成动画时，可以在initialize中使用reuse=True重复使用同一个对象，最后调用close。
+        """
+        if self.fig is not None:
+            plt.close(self.fig)
+            self.fig = None
+            self.ax = None
 
 
 class DashboardGenerator:
@@ -385,26 +631,71 @@ class DashboardGenerator:
     仪表板生成器类
     
     用于创建交互式仪表板，显示模拟结果。
+    
+    create_dashboard记录统计原始数据的摘要，统计数据与上一次调用相同时不再计算统计量和构造条形图，
+    而是复制上一次构造的图形返回；每次返回的都是新的图形对象，调用者对它的修改不影响之后的调用。
+    
+    资源或活动数量超过LARGE_MODEL时，条形图不显示悬停信息、条形之间不留间隙，
+    坐标轴固定为类别轴，并关闭交互时的过渡动画，以减轻浏览器渲染负担。
     """
     
+    # 按大模型方式绘制仪表板的资源或活动数量阈值
+    LARGE_MODEL = 200
+    
     def __init__(self):
         """
         初始化仪表板生成器
         """
         self.fig = None
+        self._figure = None
+        self._key = None
     
     def create_dashboard(self, simulation_statistics):
         """
         创建仪表板
         
+        每次返回新的图形对象，修改返回的图形不影响之后的调用。
+        
         参数:
             simulation_statistics (SimulationStatistics): 模拟统计对象
         
         返回:
             plotly.graph_objects.Figure: 图形对象
         """
+        # 统计数据与上一次相同时复制已有的图形，不再计算统计量和构造条形图
+        key = _statistics_digest(simulation_statistics)
+        if key != self._key:
+            self._figure = self._build_figure(simulation_statistics)
+            self._key = key
+        # 构造时已经验证过，复制时跳过验证
+        self.fig = go.Figure(self._figure, skip_invalid=True)
+        return self.fig
+    
+    def _build_figure(self, simulation_statistics):
+        """
+        根据模拟统计构造仪表板图形
+        
+        参数:
+            simulation_statistics (SimulationStatistics): 模拟统计对象
+        
+        返回:
+            plotly.graph_objects.Figure: 图形对象
+        """
+        # 资源和活动的统计数据各遍历一次
+        resource_ids, busy, total_time = simulation_statistics.to_arrays()
+        resource_ids = resource_ids.tolist()
+        utilization_rates = busy / total_time if total_time > 0 else np.zeros_like(busy)
+        
+        activity_ids = []
+        activity_values = np.empty((len(simulation_statistics.activity_statistics), 3))
+        for i, (activity_id, stats) in enumerate(simulation_statistics.activity_statistics.items()):
+            activity_ids.append(activity_id)
+            activity_values[i] = (stats.completion_count, stats.calculate_average_waiting_time(),
+                                  stats.calculate_average_service_time())
+        completion_counts, avg_waiting_times, avg_service_times = activity_values.T
+        
         # 创建子图
-        self.fig = make_subplots(
+        fig = make_subplots(
             rows=2, cols=2,
             subplot_titles=("Resource Utilization", "Activity Completion Count", 
                            "Average Waiting Time", "Average Service Time"),
@@ -412,74 +703,58 @@ class DashboardGenerator:
                   [{"type": "bar"}, {"type": "bar"}]]
         )
         
-        # 资源利用率
-        resource_ids = []
-        utilization_rates = []
-        
-        for resource_id, stats in simulation_statistics.resource_statistics.items():
-            resource_ids.append(resource_id)
-            utilization_rates.append(stats.calculate_utilization_rate(simulation_statistics.total_simulation_time))
+        # 大模型的条形图不生成悬停信息
+        large = max(len(resource_ids), len(activity_ids)) > self.LARGE_MODEL
+        bar = dict(type="bar", hoverinfo="skip") if large else dict(type="bar")
         
-        self.fig.add_trace(
-            go.Bar(x=resource_ids, y=utilization_rates, name="Utilization Rate"),
+        # 资源利用率
+        fig.add_trace(
+            dict(bar, x=resource_ids, y=utilization_rates, name="Utilization Rate"),
             row=1, col=1
         )
         
         # 活动完成次数
-        activity_ids = []
-        completion_counts = []
-        
-        for activity_id, stats in simulation_statistics.activity_statistics.items():
-            activity_ids.append(activity_id)
-            completion_counts.append(stats.completion_count)
-        
-        self.fig.add_trace(
-            go.Bar(x=activity_ids, y=completion_counts, name="Completion Count"),
+        fig.add_trace(
+            dict(bar, x=activity_ids, y=completion_counts, name="Completion Count"),
             row=1, col=2
         )
         
         # 平均等待时间
-        activity_ids = []
-        avg_waiting_times = []
-        
-        for activity_id, stats in simulation_statistics.activity_statistics.items():
-            activity_ids.append(activity_id)
-            avg_waiting_times.append(stats.calculate_average_waiting_time())
-        
-        self.fig.add_trace(
-            go.Bar(x=activity_ids, y=avg_waiting_times, name="Average Waiting Time"),
+        fig.add_trace(
+            dict(bar, x=activity_ids, y=avg_waiting_times, name="Average Waiting Time"),
             row=2, col=1
         )
         
         # 平均服务时间
-        activity_ids = []
-        avg_service_times = []
-        
-        for activity_id, stats in simulation_statistics.activity_statistics.items():
-            activity_ids.append(activity_id)
-            avg_service_times.append(stats.calculate_average_service_time())
-        
-        self.fig.add_trace(
-            go.Bar(x=activity_ids, y=avg_service_times, name="Average Service Time"),
+        fig.add_trace(
+            dict(bar, x=activity_ids, y=avg_service_times, name="Average Service Time"),
             row=2, col=2
         )
         
         # 更新布局
-        self.fig.update_layout(
+        fig.update_layout(
             title_text="SDESA Simulation Dashboard",
             height=800,
             width=1200,
             showlegend=False
         )
+        if large:
+            fig.update_layout(bargap=0, uirevision="constant", transition_duration=0)
+            fig.update_xaxes(type="category")
         
-        return self.fig
+        return fig
     
-    def save(self, filename):
+    def save(self, filename, include_plotlyjs='cdn'):
         """
         保存仪表板
         
+        图形在create_dashboard中已经构造完成，保存时不再验证。
+        每次保存都重新序列化fig，因此之后对fig的修改会体现在保存的文件中。
+        
         参数:
             filename (str): 文件名
+            include_plotlyjs (bool or str, optional): 如何引入plotly.js，默认为'cdn'，即从CDN加载；
+                为True时将plotly.js嵌入文件，可以离线查看
         
         返回:
             str: 保存的文件名
@@ -487,5 +762,7 @@ class DashboardGenerator:
         if self.fig is None:
             raise ValueError("Please call create_dashboard() before save()")
         
-        self.fig.write_html(filename)
+        html = pio.to_html(self.fig, validate=False, include_plotlyjs=include_plotlyjs)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(html)
         return filename